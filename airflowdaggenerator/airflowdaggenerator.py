@@ -1,99 +1,955 @@
 import argparse
+import cProfile
+import json
 import os
 import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain, islice
 
 import yaml
-from airflow.models import DagBag
-from jinja2 import Environment, FileSystemLoader
+
+from . import instrumentation
+from .buildcache import compute_build_key, is_up_to_date, load_build_cache, record_build, save_build_cache
+from .configs import SafeLoader, iter_configs, load_config, load_config_layers, merge_configs
+from .dependencyindex import (get_affected_dag_files, get_affected_jobs, get_output_dag_file, get_recorded_dependencies,
+                              load_dependency_index, record_dependencies, save_dependency_index)
+from .output import compute_hash, update_output_manifest, write_diff, write_if_changed
+from .schemas import get_template_schema
+from .templates import get_template_environment, get_template_search_path
+from .validation import TASK_ID_PATTERN, check_dag_file
+
+JOB_KEYS = ('input_config_yaml_path', 'input_config_yaml_file_name', 'input_template_path', 'input_template_file_name',
+            'output_dag_path', 'output_dag_file_name')
+OPTIONAL_JOB_KEYS = ('config_layers',)
+
+# Maximum number of jobs handed over to a worker process at once, so that the jobs are sent in a few messages
+JOBS_PER_CHUNK = 16
+# Number of chunks of jobs queued per worker process, so that a worker done with its chunk picks up the next one right
+# away, and that lazily loaded jobs are never all held in memory together
+CHUNKS_PER_WORKER = 4
+
+GenerationResult = namedtuple('GenerationResult', ['config_file', 'output_dag_file', 'error', 'skipped', 'changed'])
+GenerationResult.__doc__ = """
+Outcome of generating (and validating) a single DAG in batch mode. error is None when the DAG was generated (and
+validated) successfully, otherwise it holds the reason of the failure. skipped is True when the DAG file was left
+untouched because the build cache shows it is up to date, and changed is True when the DAG file was (re)written, that
+is when the rendered DAG differs from the existing file.
+"""
 
 
 def generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path, input_template_file_name,
-                 output_dag_path, output_dag_file_name):
+                 output_dag_path, output_dag_file_name, bytecode_cache_dir=None, config_layers=None, diff_stream=None):
     """
     Generates DAG Py file based on the given DAG Jinja2 template file and the configuration yml file and write it to the
     provided output_dag_path folder with the name output_dag_file_name.
 
+    The configuration can be layered over shared configuration files, like the global defaults then the defaults of a
+    team: the layers and the DAG configuration are deep merged in order (see configs.merge_configs), the DAG
+    configuration taking precedence.
+
+    With a diff stream (dry run), the DAG is only rendered in memory: the unified diff between the existing DAG file
+    and the rendered DAG is written to the stream instead of the file, and nothing is written to disk (the bytecode
+    cache is not used).
+
     :param input_config_yaml_path: Path to the DAG configuration input YAML file
-    :param input_config_yaml_file_name: DAG configuration input yaml file name
-    :param input_template_path: Path to the DAG Jinja2 Template file
+    :param input_config_yaml_file_name: DAG configuration input yaml file name (or JSON Lines file with a .jsonl
+     extension), holding the configuration of a single DAG
+    :param input_template_path: Path to the DAG Jinja2 Template file, or a search path of several template folders
+     (see templates.get_template_search_path) so the template can extend, include or import shared templates
     :param input_template_file_name: Input DAG Jinja2 Template file name (.j2 extension file)
     :param output_dag_path: Path for the generated DAG Py file
     :param output_dag_file_name: Name for the generated DAG Py file
+    :param bytecode_cache_dir: Path to the folder to persist the compiled Jinja2 templates in, so that following runs
+     skip the template compilation. None disables it
+    :param config_layers: list of paths to the configuration layer files the DAG configuration is merged over, the
+     last one taking precedence. None (or an empty list) disables the layering
+    :param diff_stream: text stream to write the diff of the DAG file to instead of writing it, like sys.stdout. None
+     writes the DAG file
 
-    :returns: None
+    :returns: whether the DAG file was written (or, with a diff stream, would be), False when it already held the
+     rendered DAG
 
     :raises ValueError: when the user provided input is invalid. For example, if the output dag file name provided is not
-     a .py file or the input YAML config file doesn't contain any parameters or is invalid
+     a .py file or the input YAML config file doesn't contain any parameters, contains more than one DAG configuration,
+     is invalid or doesn't match the schema of the template (see schemas.get_template_schema)
     """
+    if not output_dag_file_name.endswith('.py'):
+        raise ValueError("Invalid output dag file name. It should be a .py extension file")
+
+    if diff_stream is not None:
+        bytecode_cache_dir = None
 
     # Load DAG configuration input from the YAML file into Python dictionary
+    config = _load_config(input_config_yaml_path + os.path.sep + input_config_yaml_file_name, output_dag_file_name)
+    if config_layers:
+        config = merge_configs(load_config_layers(config_layers), config)
+    _check_config(config, input_template_path, input_template_file_name, output_dag_file_name, bytecode_cache_dir)
+    changed, _ = _write_dag(config, input_template_path, input_template_file_name, output_dag_path,
+                            output_dag_file_name, bytecode_cache_dir, diff_stream)
+    return changed
+
+
+def _load_config(config_file, output_dag_file_name):
+    with instrumentation.measure('config_load', output_dag_file_name) as event:
+        config = load_config(config_file)
+        if event:
+            event['bytes'] = os.path.getsize(config_file)
+    return config
+
+
+def _check_config(config, input_template_path, input_template_file_name, output_dag_file_name,
+                  bytecode_cache_dir=None):
+    """Validates the configuration against the schema of the template, if any, before it is rendered."""
+    with instrumentation.measure('schema_validate', output_dag_file_name):
+        validate_config = get_template_schema(get_template_environment(input_template_path, bytecode_cache_dir),
+                                              input_template_file_name)
+        errors = validate_config(config) if validate_config else []
+    if errors:
+        raise ValueError("Invalid DAG configuration. Errors: {}".format('; '.join(errors)))
+
+
+def _render_dag(config, input_template_path, input_template_file_name, output_dag_file_name, bytecode_cache_dir=None):
+    # Load input Jinja2 template
+    with instrumentation.measure('template_compile', output_dag_file_name):
+        template = get_template_environment(input_template_path, bytecode_cache_dir).get_template(
+            input_template_file_name)
+
+    with instrumentation.measure('render', output_dag_file_name) as event:
+        dag_source = template.render(config)
+        if event:
+            event['bytes'] = len(dag_source.encode('utf-8'))
+    return dag_source
+
+
+def _write_dag(config, input_template_path, input_template_file_name, output_dag_path, output_dag_file_name,
+               bytecode_cache_dir=None, diff_stream=None):
+    """
+    Renders the DAG Jinja2 template with the given configuration into the output Python DAG source file, see
+    output.write_if_changed, or into its diff written to the diff stream, see output.write_diff. Returns whether the
+    file was written (or would be) along with the hash of its content.
+    """
     if not output_dag_file_name.endswith('.py'):
         raise ValueError("Invalid output dag file name. It should be a .py extension file")
 
-    config = yaml.load(open(input_config_yaml_path + os.path.sep + input_config_yaml_file_name), Loader=yaml.FullLoader)
-    if config is None:
-        raise ValueError("Invalid input configuration YML file")
+    dag_source = _render_dag(config, input_template_path, input_template_file_name, output_dag_file_name,
+                             bytecode_cache_dir)
 
-    # Load input Jinja2 template
-    env = Environment(loader=FileSystemLoader(input_template_path), trim_blocks=True, lstrip_blocks=True)
-    template = env.get_template(input_template_file_name)
+    if diff_stream is not None:
+        with instrumentation.measure('diff', output_dag_file_name):
+            changed = write_diff(output_dag_path + os.path.sep + output_dag_file_name, dag_source, diff_stream)
+        return changed, compute_hash(dag_source)
 
-    # Write to the output Python DAG source file
-    with open(output_dag_path + os.path.sep + output_dag_file_name, "w") as output_file:
-        output_file.write(template.render(config))
+    # Write to the output Python DAG source file, unless it already holds the rendered DAG
+    with instrumentation.measure('write', output_dag_file_name) as event:
+        changed = write_if_changed(output_dag_path + os.path.sep + output_dag_file_name, dag_source)
+        if event:
+            event['changed'] = changed
+            event['bytes'] = len(dag_source.encode('utf-8')) if changed else 0
+    return changed, compute_hash(dag_source)
 
 
-def validate_dag(output_dag_path):
+def validate_dag(output_dag_path, validation_pool=None):
     """
-    Validates the generated Python DAG file by leveraging airflow DagBag.
+    Validates the generated Python DAG file(s) by leveraging airflow DagBag.
 
-    :param output_dag_path: Path to the generated Python DAG file
+    :param output_dag_path: Path to a generated Python DAG file or a list of them, each file is imported on its own so
+     the validation doesn't depend on the other DAGs present in the same folder. A path to a folder validates every DAG
+     of the folder.
+    :param validation_pool: validationpool.ValidationPool importing the DAG files in isolated worker processes, None
+     imports them in the current process
 
     :returns: None
 
     :raises AssertionError: when there is validation error on the generated DAG files
     """
-    dag_bag = DagBag(dag_folder=output_dag_path)
-    if len(dag_bag.import_errors):
-        print('DAG import failures. Errors: {}'.format(dag_bag.import_errors))
-        raise AssertionError('DAG import failures. Errors: {}'.format(dag_bag.import_errors))
+    import_errors = get_import_errors(output_dag_path, validation_pool)
+    if import_errors:
+        print('DAG import failures. Errors: {}'.format(import_errors))
+        raise AssertionError('DAG import failures. Errors: {}'.format(import_errors))
+
+
+def get_import_errors(output_dag_path, validation_pool=None):
+    """
+    Imports the generated Python DAG file(s) into airflow DagBag and collects their import errors. Every file is loaded
+    into its own DagBag without the Airflow examples, so only the given files are imported. Every file is first
+    statically validated (see validation.check_dag_source), the files failing it are rejected without being imported.
+
+    :param output_dag_path: Path to a generated Python DAG file or a list of them. A path to a folder imports every DAG
+     of the folder into a single DagBag.
+    :param validation_pool: validationpool.ValidationPool importing the DAG files in isolated worker processes, None
+     imports them in the current process. With a pool, a path to a folder imports every DAG file of the folder on its
+     own
+
+    :returns: dictionary of DAG file path to its import error, empty when all the DAG files are valid
+    """
+    if validation_pool is not None:
+        if isinstance(output_dag_path, str) and os.path.isdir(output_dag_path):
+            output_dag_path = [os.path.join(output_dag_path, file_name)
+                               for file_name in sorted(os.listdir(output_dag_path)) if file_name.endswith('.py')]
+        return validation_pool.get_import_errors([output_dag_path] if isinstance(output_dag_path, str)
+                                                 else output_dag_path)
+    if isinstance(output_dag_path, str) and os.path.isdir(output_dag_path):
+        with instrumentation.measure('dagbag_import', output_dag_path):
+            return dict(_get_dag_bag(output_dag_path).import_errors)
+
+    output_dag_files = [output_dag_path] if isinstance(output_dag_path, str) else output_dag_path
+    import_errors = {}
+    for output_dag_file in output_dag_files:
+        with instrumentation.measure('static_validate', os.path.basename(output_dag_file)):
+            static_errors = check_dag_file(output_dag_file)
+        if static_errors:
+            import_errors[output_dag_file] = '\n'.join(static_errors)
+        else:
+            with instrumentation.measure('dagbag_import', os.path.basename(output_dag_file)):
+                import_errors.update(_get_dag_bag(output_dag_file, include_examples=False).import_errors)
+    return import_errors
+
+
+def _get_dag_bag(dag_folder, **kwargs):
+    # Airflow is imported only when a DagBag is actually needed, as its import (and configuration bootstrap) takes
+    # seconds and isn't needed to generate the DAG files
+    from airflow.models import DagBag
+    return DagBag(dag_folder=dag_folder, **kwargs)
+
+
+def load_manifest(manifest_path):
+    """
+    Loads the batch generation jobs from a manifest YAML file. The manifest contains a list of jobs under the "jobs"
+    key, each of them having the same keys as the arguments of generate_dag (config_layers being optional), and
+    optionally a "defaults" mapping which is applied to every job. Relative paths are resolved against the folder of
+    the manifest file.
+
+    Sample manifest::
+
+        defaults:
+          input_template_path: [templates, shared_templates]
+          input_template_file_name: sample_dag_template.py.j2
+          output_dag_path: dags
+          config_layers: [layers/global.yml, layers/data_team.yml]
+        jobs:
+          - input_config_yaml_path: configs
+            input_config_yaml_file_name: dag_properties.yml
+            output_dag_file_name: test_dag.py
+
+    :param manifest_path: Path to the manifest YAML file
+
+    :returns: list of job dictionaries accepted by generate_dags
+
+    :raises ValueError: when the manifest is invalid or a job is missing one of the generate_dag arguments
+    """
+    with open(manifest_path) as manifest_file:
+        manifest = yaml.load(manifest_file, Loader=SafeLoader)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('jobs'), list):
+        raise ValueError("Invalid manifest file. It should contain a list of jobs under the 'jobs' key")
+
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for job in manifest['jobs']:
+        job = dict(manifest.get('defaults') or {}, **job)
+        missing_keys = [key for key in JOB_KEYS if key not in job]
+        if missing_keys:
+            raise ValueError("Invalid manifest job {}. Missing keys: {}".format(job, missing_keys))
+        for key in ('input_config_yaml_path', 'output_dag_path'):
+            job[key] = os.path.join(manifest_dir, job[key])
+        job['input_template_path'] = [os.path.join(manifest_dir, template_folder)
+                                      for template_folder in get_template_search_path(job['input_template_path'])]
+        if job.get('config_layers'):
+            job['config_layers'] = [os.path.join(manifest_dir, config_layer) for config_layer in job['config_layers']]
+        jobs.append({key: job[key] for key in JOB_KEYS + OPTIONAL_JOB_KEYS if key in job})
+    return jobs
+
+
+def jobs_from_config_directory(input_config_yaml_dir, input_template_path, input_template_file_name,
+                               output_dag_path, config_layers=None):
+    """
+    Builds the batch generation jobs for every YAML configuration file (.yml or .yaml) in the given folder, rendered
+    with the same Jinja2 template. Each generated DAG file is named after its configuration file, for example
+    dag_properties.yml is generated as dag_properties.py.
+
+    :param input_config_yaml_dir: Path to the folder containing the DAG configuration input YAML files
+    :param input_template_path: Path to the DAG Jinja2 Template file
+    :param input_template_file_name: Input DAG Jinja2 Template file name (.j2 extension file)
+    :param output_dag_path: Path for the generated DAG Py files
+    :param config_layers: list of paths to the configuration layer files every DAG configuration is merged over, see
+     generate_dag
+
+    :returns: list of job dictionaries accepted by generate_dags
+    """
+    return [_with_config_layers(dict(input_config_yaml_path=input_config_yaml_dir,
+                                     input_config_yaml_file_name=config_file_name,
+                                     input_template_path=input_template_path,
+                                     input_template_file_name=input_template_file_name,
+                                     output_dag_path=output_dag_path,
+                                     output_dag_file_name=os.path.splitext(config_file_name)[0] + '.py'),
+                                config_layers)
+            for config_file_name in sorted(os.listdir(input_config_yaml_dir))
+            if config_file_name.endswith(('.yml', '.yaml'))]
+
+
+def jobs_from_config_stream(config_file, input_template_path, input_template_file_name, output_dag_path,
+                            config_layers=None):
+    """
+    Lazily builds a batch generation job for every DAG configuration of a multi-document YAML file or a JSON Lines
+    file (see configs.iter_configs), rendered with the same Jinja2 template. The configurations are read one at a time
+    while the jobs are consumed, so the whole file is never loaded in memory. Each generated DAG file is named after the
+    dag_id of its configuration, or after the configuration file and the position of the configuration in it when the
+    configuration has no (valid) dag_id, for example dags_3.py. A configuration whose DAG file name was already taken
+    by a previous configuration of the file yields a job failing its generation, instead of overwriting the DAG file.
+
+    :param config_file: Path to the DAG configuration input YAML or JSON Lines file
+    :param input_template_path: Path to the DAG Jinja2 Template file
+    :param input_template_file_name: Input DAG Jinja2 Template file name (.j2 extension file)
+    :param output_dag_path: Path for the generated DAG Py files
+    :param config_layers: list of paths to the configuration layer files every DAG configuration is merged over, see
+     generate_dag
+
+    :returns: generator of job dictionaries accepted by generate_dags
+    """
+    config_file_stem = os.path.splitext(os.path.basename(config_file))[0]
+    # Only the names are kept, so the memory held stays small even for thousands of DAGs
+    dag_file_names = set()
+    for index, config in enumerate(iter_configs(config_file)):
+        dag_id = config.get('dag_id') if isinstance(config, dict) else None
+        if not isinstance(dag_id, str) or not TASK_ID_PATTERN.match(dag_id):
+            dag_id = '{}_{}'.format(config_file_stem, index)
+        job = _with_config_layers(dict(config=config,
+                                       config_source='{}#{}'.format(config_file, index),
+                                       input_template_path=input_template_path,
+                                       input_template_file_name=input_template_file_name,
+                                       output_dag_path=output_dag_path,
+                                       output_dag_file_name=dag_id + '.py'),
+                                  config_layers)
+        if job['output_dag_file_name'] in dag_file_names:
+            job['error'] = ("Invalid DAG configuration. Duplicated DAG file name {}, already generated from a "
+                            "previous configuration of {}".format(job['output_dag_file_name'], config_file))
+        dag_file_names.add(job['output_dag_file_name'])
+        yield job
+
+
+def _with_config_layers(job, config_layers):
+    if config_layers:
+        job['config_layers'] = list(config_layers)
+    return job
+
+
+def generate_dags(jobs, validate=True, workers=1, build_cache_file=None, bytecode_cache_dir=None,
+                  output_manifest_file=None, validation_pool=None, diff_stream=None, dependency_index_file=None):
+    """
+    Generates (and validates) many DAG Py files in one process. Every job is a dictionary holding the arguments of
+    generate_dag, or an already loaded DAG configuration under the "config" key (along with a "config_source"
+    description) instead of the configuration file arguments. The jobs are consumed lazily. The Jinja2 Environment, the
+    compiled templates and the merged configuration layers are shared by all the jobs, and a failing job doesn't stop
+    the generation of the remaining ones.
+
+    With more than one worker, the YAML parsing, template rendering and validation of the jobs are spread across a
+    pool of processes, each of them reusing its own Jinja2 Environment. A bounded number of chunks of jobs is queued to
+    the workers at any time, a new chunk being queued as soon as the oldest one is done, and the results are still
+    returned in the order of the jobs.
+
+    With a build cache file, the DAGs whose configuration (and configuration layers), templates (including the
+    included, extended and imported ones) and generator version are unchanged since they were last successfully
+    generated are skipped: neither rendered, written nor validated, so their files keep their modification time. A DAG
+    generated without being validated isn't skipped when validating, so that it gets validated.
+
+    With a dependency index file, the files each DAG is generated from are recorded into the dependency index (see
+    dependencyindex.get_affected_dag_files), so that the DAGs affected by a change can be found without rendering
+    them.
+
+    With a diff stream (dry run), the DAGs are only rendered in memory and the unified diffs between the existing DAG
+    files and the rendered DAGs are written to the stream: nothing is written to disk (neither the DAG files, the build
+    cache, the output manifest, the dependency index nor the bytecode cache), the build cache doesn't skip any DAG and
+    the DAGs aren't validated. The changed attribute of the results tells which DAG files would change.
+
+    :param jobs: iterable of job dictionaries, see load_manifest, jobs_from_config_directory and jobs_from_config_stream
+    :param validate: whether to validate each generated DAG file by leveraging airflow DagBag
+    :param workers: number of processes to generate the DAGs with, 1 generates them in the current process
+    :param build_cache_file: Path to the build cache JSON file, None disables the build cache
+    :param bytecode_cache_dir: Path to the folder to persist the compiled Jinja2 templates in, None disables it
+    :param output_manifest_file: Path to the output manifest JSON file recording the content hash of every generated
+     DAG file (see output.update_output_manifest), None disables it
+    :param validation_pool: validationpool.ValidationPool validating all the generated DAG files in isolated worker
+     processes once they are all generated, None validates each DAG file in the process generating it
+    :param diff_stream: text stream to write the diffs of the DAG files to instead of writing them, like sys.stdout.
+     None writes the DAG files
+    :param dependency_index_file: Path to the dependency index JSON file, see dependencyindex.load_dependency_index.
+     None disables it
+
+    :returns: list of GenerationResult, in the same order as the jobs
+
+    :raises ValueError: when the number of workers is less than 1, or more than 1 with a diff stream
+    """
+    if workers < 1:
+        raise ValueError("Invalid number of workers. It should be 1 or more")
+    if diff_stream is not None:
+        if workers != 1:
+            raise ValueError("Invalid number of workers. The diffs can only be generated by 1 worker")
+        validate = False
+        build_cache_file = bytecode_cache_dir = output_manifest_file = dependency_index_file = None
+    build_cache = load_build_cache(build_cache_file) if build_cache_file else None
+    dependency_index = load_dependency_index(dependency_index_file) if dependency_index_file else None
+    run_job = partial(_run_job, validate=validate and validation_pool is None, bytecode_cache_dir=bytecode_cache_dir,
+                      diff_stream=diff_stream, record_dependencies=dependency_index is not None,
+                      require_validated=validate)
+    outcomes = []
+
+    def add_outcome(job, outcome):
+        # The jobs aren't kept, so the dependencies are recorded as the outcomes come
+        result, _, _, dependencies = outcome
+        if dependency_index is not None:
+            if not result.skipped:
+                record_dependencies(dependency_index, job, dependencies)
+            elif get_output_dag_file(job) not in dependency_index:
+                # The dependencies of the skipped DAGs are unchanged, as their templates are part of their build key
+                record_dependencies(dependency_index, job, get_recorded_dependencies(job, bytecode_cache_dir))
+        outcomes.append(outcome)
+
+    if workers == 1:
+        for job in jobs:
+            add_outcome(job, run_job(job, build_cache=build_cache))
+    else:
+        jobs = iter(jobs)
+        # The chunks are sized after the first jobs, so that a few jobs are spread across all the workers as well
+        first_jobs = list(islice(jobs, workers * CHUNKS_PER_WORKER * JOBS_PER_CHUNK))
+        chunk_size = max(1, len(first_jobs) // (workers * CHUNKS_PER_WORKER))
+        jobs = chain(first_jobs, jobs)
+        # The instrumentation events of the workers are handed over to the hooks registered in this process
+        run_jobs = partial(_run_jobs_collecting_events, run_job, instrumentation.has_hooks())
+
+        def add_chunk_outcomes(chunk, future):
+            chunk_outcomes, events = future.result()
+            for event in events or []:
+                instrumentation.emit(event)
+            for job, outcome in zip(chunk, chunk_outcomes):
+                add_outcome(job, outcome)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending_chunks = deque()
+            for chunk in iter(lambda: list(islice(jobs, chunk_size)), []):
+                if len(pending_chunks) == workers * CHUNKS_PER_WORKER:
+                    add_chunk_outcomes(*pending_chunks.popleft())
+                # Every job is sent along with its own build cache entry only, not the whole build cache
+                pending_chunks.append((chunk, executor.submit(
+                    run_jobs, [(job, _get_job_build_cache(build_cache, job)) for job in chunk])))
+            while pending_chunks:
+                add_chunk_outcomes(*pending_chunks.popleft())
+
+    if validate and validation_pool is not None:
+        import_errors = validation_pool.get_import_errors([result.output_dag_file for result, _, _, _ in outcomes
+                                                           if not result.error and not result.skipped])
+        outcomes = [(result._replace(error='DAG import failures. Errors: {}'.format(
+                        {result.output_dag_file: import_errors[result.output_dag_file]}))
+                     if result.output_dag_file in import_errors else result, build_key, output_hash, dependencies)
+                    for result, build_key, output_hash, dependencies in outcomes]
+
+    if build_cache is not None:
+        for result, build_key, _, _ in outcomes:
+            output_dag_file = os.path.abspath(result.output_dag_file)
+            if result.error:
+                build_cache.pop(output_dag_file, None)
+            elif build_key and not result.skipped:
+                # A skipped DAG keeps its entry, and whether it was validated
+                record_build(build_cache, output_dag_file, build_key, validate)
+        save_build_cache(build_cache_file, build_cache)
+    if output_manifest_file:
+        # Only the DAG files written (or confirmed unchanged) are recorded. A DAG failing before being written keeps
+        # the entry of its file, which is still there, as a removed entry would read as a deleted file
+        update_output_manifest(output_manifest_file, {result.output_dag_file: output_hash
+                                                      for result, _, output_hash, _ in outcomes if output_hash})
+    if dependency_index is not None:
+        save_dependency_index(dependency_index_file, dependency_index)
+    return [result for result, _, _, _ in outcomes]
+
+
+def check_configs(jobs, bytecode_cache_dir=None):
+    """
+    Loads the configuration of every batch generation job (see generate_dags) and validates it against the schema of
+    its template (see schemas.get_template_schema), without rendering nor importing any DAG. Each schema is compiled
+    once and applied to all the configurations of its template, and the errors of all the configurations are collected
+    instead of stopping at the first invalid one.
+
+    :param jobs: iterable of job dictionaries, see load_manifest, jobs_from_config_directory and jobs_from_config_stream
+    :param bytecode_cache_dir: Path to the folder to persist the compiled Jinja2 templates in, None disables it
+
+    :returns: dictionary of configuration file (or config_source) to its error, empty when all the configurations are
+     valid
+    """
+    config_errors = {}
+    for job in jobs:
+        try:
+            _load_job_config(job, bytecode_cache_dir)
+        except Exception as exception:
+            config_errors[_get_config_file(job)] = '{}: {}'.format(type(exception).__name__, exception)
+    return config_errors
+
+
+def _run_jobs_collecting_events(run_job, collect_events, jobs):
+    with instrumentation.collect_events(collect_events) as events:
+        return [run_job(job, build_cache=build_cache) for job, build_cache in jobs], events
+
+
+def _get_job_build_cache(build_cache, job):
+    """Returns the build cache holding the entry of the DAG of the job alone, None when the build cache is disabled."""
+    if build_cache is None:
+        return None
+    output_dag_file = get_output_dag_file(job)
+    return {output_dag_file: build_cache[output_dag_file]} if output_dag_file in build_cache else {}
+
+
+def _run_job(job, validate, build_cache=None, bytecode_cache_dir=None, diff_stream=None, record_dependencies=False,
+             require_validated=False):
+    """
+    Generates (and validates) the DAG of a single batch job, capturing any failure into its GenerationResult. A DAG
+    up to date in the build cache is skipped, unless it is required to be validated and was generated without. Returns
+    the GenerationResult along with the build key of the job, which is None when the build cache is disabled, the
+    hash of the generated DAG file, which is None when the DAG wasn't generated, and the dependencies of the DAG (see
+    dependencyindex.get_recorded_dependencies), which are None when they aren't recorded or the DAG was skipped.
+    """
+    config_file = _get_config_file(job)
+    output_dag_file = job['output_dag_path'] + os.path.sep + job['output_dag_file_name']
+    build_key = output_hash = None
+    changed = False
+    try:
+        if build_cache is not None:
+            build_key = _get_build_key(job, bytecode_cache_dir)
+            if is_up_to_date(build_cache, output_dag_file, build_key, require_validated):
+                return GenerationResult(config_file, output_dag_file, None, True, False), build_key, None, None
+        config = _load_job_config(job, bytecode_cache_dir)
+        changed, output_hash = _write_dag(config, job['input_template_path'], job['input_template_file_name'],
+                                          job['output_dag_path'], job['output_dag_file_name'], bytecode_cache_dir,
+                                          diff_stream)
+        import_errors = get_import_errors(output_dag_file) if validate else None
+        error = 'DAG import failures. Errors: {}'.format(import_errors) if import_errors else None
+    except Exception as exception:
+        error = '{}: {}'.format(type(exception).__name__, exception)
+    # Recorded for the failed DAGs as well, so that they are regenerated once their files are fixed
+    dependencies = get_recorded_dependencies(job, bytecode_cache_dir) if record_dependencies else None
+    return GenerationResult(config_file, output_dag_file, error, False, changed), build_key, output_hash, dependencies
+
+
+def _get_config_file(job):
+    if 'config' in job:
+        return job['config_source']
+    return job['input_config_yaml_path'] + os.path.sep + job['input_config_yaml_file_name']
+
+
+def _check_job(job):
+    """Fails a job flagged as invalid when it was built, see jobs_from_config_stream."""
+    if job.get('error'):
+        raise ValueError(job['error'])
+
+
+def _get_build_key(job, bytecode_cache_dir=None):
+    _check_job(job)
+    if 'config' in job:
+        config_content = json.dumps(job['config'], sort_keys=True, default=str).encode()
+    else:
+        with open(_get_config_file(job), 'rb') as config:
+            config_content = config.read()
+    for config_layer_file in reversed(job.get('config_layers') or []):
+        with open(config_layer_file, 'rb') as config_layer:
+            config_content = config_layer.read() + b'\0' + config_content
+    return compute_build_key(config_content, get_template_environment(job['input_template_path'], bytecode_cache_dir),
+                             job['input_template_file_name'])
+
+
+def _load_job_config(job, bytecode_cache_dir=None):
+    _check_job(job)
+    config = job['config'] if 'config' in job else _load_config(_get_config_file(job), job['output_dag_file_name'])
+    if job.get('config_layers'):
+        config = merge_configs(load_config_layers(job['config_layers']), config)
+    _check_config(config, job['input_template_path'], job['input_template_file_name'], job['output_dag_file_name'],
+                  bytecode_cache_dir)
+    return config
 
 
 def __get_args__(input_args):
     parser = argparse.ArgumentParser(prog='airflowdaggenerator',
                                      description="Airflow DAG Generator (airflowdaggenerator.py)::")
-    parser.add_argument("-config_yml_path", "--input_config_yaml_path", required=True,
+    parser.add_argument("-config_yml_path", "--input_config_yaml_path",
                         help="Path to the DAG configuration input YAML file")
-    parser.add_argument("-config_yml_file_name", "--input_config_yaml_file_name", required=True,
+    parser.add_argument("-config_yml_file_name", "--input_config_yaml_file_name",
                         help="DAG configuration input yaml file name")
-    parser.add_argument("-template_path", "--input_template_path", required=True,
-                        help="Path to the DAG Jinja2 Template file")
-    parser.add_argument("-template_file_name", "--input_template_file_name", required=True,
+    parser.add_argument("-template_path", "--input_template_path",
+                        help="Path to the DAG Jinja2 Template file, or several template folders separated by '{}' to "
+                             "look the templates up in".format(os.pathsep))
+    parser.add_argument("-template_file_name", "--input_template_file_name",
                         help="Input DAG Jinja2 Template file name (of .j2 extension file)")
     parser.add_argument("-dag_path", "--output_dag_path", required=True, help="Path for the generated Python DAG file")
+    __add_config_layers_arg__(parser)
     parser.add_argument("-dag_file_name", "--output_dag_file_name", required=True,
                         help="Name for the generated Python DAG file")
+    parser.add_argument("-template_cache_dir", "--bytecode_cache_dir",
+                        help="Path to the folder to persist the compiled Jinja2 templates in, to skip their "
+                             "compilation in the following runs")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--no_validate", "--no-validate", action="store_true",
+                      help="Only generate the DAG file, without validating it (Airflow isn't needed)")
+    mode.add_argument("--validate_only", "--validate-only", action="store_true",
+                      help="Only validate the already generated DAG file")
+    __add_dry_run_arg__(mode)
+    __add_validation_pool_args__(parser)
+    __add_instrumentation_args__(parser)
+    args = parser.parse_args(input_args)
+    if not args.validate_only:
+        missing_args = [option for option, value in (("-config_yml_path", args.input_config_yaml_path),
+                                                     ("-config_yml_file_name", args.input_config_yaml_file_name),
+                                                     ("-template_path", args.input_template_path),
+                                                     ("-template_file_name", args.input_template_file_name))
+                        if value is None]
+        if missing_args:
+            parser.error("the following arguments are required: {}".format(", ".join(missing_args)))
+    return args
+
+
+def __add_config_layers_arg__(parser):
+    parser.add_argument("-config_layers", "--config_layers", nargs="+",
+                        help="Paths to the configuration layer YAML files (like the global then the team defaults) "
+                             "deep merged under the DAG configuration, the last one taking precedence")
+
+
+def __add_dry_run_arg__(parser):
+    parser.add_argument("--dry_run", "--dry-run", "--diff", action="store_true",
+                        help="Print the unified diff between the existing and the rendered DAG files instead of "
+                             "writing them, and exit with a non-zero status when any of them would change (nothing is "
+                             "written nor validated)")
+
+
+def __add_validation_pool_args__(parser):
+    parser.add_argument("--isolated_validation", "--isolated-validation", action="store_true",
+                        help="Validate the DAG files in a pool of worker processes instead of the generator process")
+    parser.add_argument("-validation_workers", "--validation_workers", type=int, default=1,
+                        help="Number of isolated validation worker processes (default: 1)")
+    parser.add_argument("-validation_timeout", "--validation_timeout", type=float, default=60,
+                        help="Number of seconds an isolated validation worker may take to import a DAG file before "
+                             "being killed (default: 60)")
+    parser.add_argument("-validation_memory_limit", "--validation_memory_limit", type=int,
+                        help="Maximum memory (address space) in megabytes of every isolated validation worker")
+    parser.add_argument("-validation_max_files", "--validation_max_files", type=int, default=100,
+                        help="Number of DAG files an isolated validation worker imports before being replaced "
+                             "(default: 100)")
+
+
+@contextmanager
+def __validation_pool__(runtime_args):
+    # The watch mode has no dry run
+    dry_run = getattr(runtime_args, 'dry_run', False)
+    if not runtime_args.isolated_validation or runtime_args.no_validate or dry_run:
+        yield None
+        return
+    from .validationpool import ValidationPool
+
+    memory_limit = runtime_args.validation_memory_limit
+    with ValidationPool(workers=runtime_args.validation_workers, timeout=runtime_args.validation_timeout,
+                        memory_limit=memory_limit * 1024 * 1024 if memory_limit else None,
+                        max_files_per_worker=runtime_args.validation_max_files) as validation_pool:
+        yield validation_pool
+
+
+def __add_instrumentation_args__(parser):
+    parser.add_argument("-metrics_file", "--metrics_file",
+                        help="Path to a JSON Lines file to append the duration (and byte count) of every stage of "
+                             "every DAG to")
+    parser.add_argument("-statsd", "--statsd_address",
+                        help="host:port of a StatsD server to send the duration (and byte count) of every stage to")
+    parser.add_argument("--profile", nargs="?", const="airflowdaggenerator.prof",
+                        help="Profile the run with cProfile and dump the statistics to the given file (default: "
+                             "airflowdaggenerator.prof), readable by pstats, snakeviz or flameprof")
+
+
+@contextmanager
+def __instrumentation__(runtime_args):
+    exporters = []
+    if runtime_args.metrics_file:
+        exporters.append(instrumentation.JsonLinesExporter(runtime_args.metrics_file))
+    if runtime_args.statsd_address:
+        host, _, port = runtime_args.statsd_address.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError("Invalid StatsD address '{}', expected host:port".format(runtime_args.statsd_address))
+        exporters.append(instrumentation.StatsdExporter(host, int(port)))
+    for exporter in exporters:
+        instrumentation.add_hook(exporter)
+    profile = cProfile.Profile() if runtime_args.profile else None
+    try:
+        if profile:
+            profile.enable()
+        yield
+    finally:
+        if profile:
+            profile.disable()
+            profile.dump_stats(runtime_args.profile)
+            print("Profile statistics written to '{0}'".format(runtime_args.profile))
+        for exporter in exporters:
+            instrumentation.remove_hook(exporter)
+            exporter.close()
+
+
+def __get_jobs_parser__(prog, description):
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    jobs_source = parser.add_mutually_exclusive_group(required=True)
+    jobs_source.add_argument("-manifest", "--manifest_path", help="Path to the batch generation manifest YAML file")
+    jobs_source.add_argument("-config_yml_dir", "--input_config_yaml_dir",
+                             help="Path to the folder containing the DAG configuration input YAML files")
+    jobs_source.add_argument("-config_stream", "--input_config_stream_file",
+                             help="Path to a multi-document YAML file or a JSON Lines file holding one DAG "
+                                  "configuration per document or line")
+    parser.add_argument("-template_path", "--input_template_path",
+                        help="Path to the DAG Jinja2 Template file, or several template folders separated by '{}' "
+                             "(required with -config_yml_dir and -config_stream)".format(os.pathsep))
+    parser.add_argument("-template_file_name", "--input_template_file_name",
+                        help="Input DAG Jinja2 Template file name (required with -config_yml_dir and -config_stream)")
+    parser.add_argument("-dag_path", "--output_dag_path",
+                        help="Path for the generated Python DAG files (required with -config_yml_dir and "
+                             "-config_stream)")
+    __add_config_layers_arg__(parser)
+    parser.add_argument("--no_validate", "--no-validate", action="store_true",
+                        help="Skip the validation of the generated DAG files (Airflow isn't needed)")
+    parser.add_argument("-template_cache_dir", "--bytecode_cache_dir",
+                        help="Path to the folder to persist the compiled Jinja2 templates in, to skip their "
+                             "compilation in the following runs")
+    __add_validation_pool_args__(parser)
+    __add_instrumentation_args__(parser)
+    return parser
+
+
+def __parse_jobs_args__(parser, input_args):
+    args = parser.parse_args(input_args)
+    if not args.manifest_path and not (args.input_template_path and args.input_template_file_name and
+                                       args.output_dag_path):
+        parser.error("-config_yml_dir and -config_stream require -template_path, -template_file_name and -dag_path")
+    return args
+
+
+def __get_jobs__(runtime_args):
+    if runtime_args.manifest_path:
+        return load_manifest(runtime_args.manifest_path)
+    if runtime_args.input_config_yaml_dir:
+        return jobs_from_config_directory(runtime_args.input_config_yaml_dir,
+                                          runtime_args.input_template_path,
+                                          runtime_args.input_template_file_name,
+                                          runtime_args.output_dag_path,
+                                          runtime_args.config_layers)
+    return jobs_from_config_stream(runtime_args.input_config_stream_file,
+                                   runtime_args.input_template_path,
+                                   runtime_args.input_template_file_name,
+                                   runtime_args.output_dag_path,
+                                   runtime_args.config_layers)
+
+
+def __print_results__(results):
+    for result in results:
+        if result.output_dag_file is None:
+            print("FAILED: {0}".format(result.error))
+        elif result.error:
+            print("FAILED '{0}' ({1}): {2}".format(result.output_dag_file, result.config_file, result.error))
+        elif result.skipped:
+            print("UP TO DATE '{0}'".format(result.output_dag_file))
+        elif not result.changed:
+            print("UNCHANGED '{0}'".format(result.output_dag_file))
+        else:
+            print("OK '{0}'".format(result.output_dag_file))
+
+
+def __get_batch_args__(input_args):
+    parser = __get_jobs_parser__('airflowdaggenerator batch',
+                                 "Airflow DAG Generator (airflowdaggenerator.py) batch mode::")
+    parser.add_argument("-workers", "--workers", type=int, default=1,
+                        help="Number of processes to generate and validate the DAGs with (default: 1)")
+    parser.add_argument("-build_cache", "--build_cache_file",
+                        help="Path to the build cache JSON file, the up to date DAGs recorded in it are skipped")
+    parser.add_argument("-output_manifest", "--output_manifest_file",
+                        help="Path to the output manifest JSON file recording the content hash of every generated DAG "
+                             "file")
+    parser.add_argument("-shards", "--shards", type=int,
+                        help="Render all the DAGs into this number of shard modules per output folder instead of a "
+                             "DAG file per DAG (a DAG always goes to the same shard)")
+    parser.add_argument("-shard_prefix", "--shard_file_prefix", default="dag_shard",
+                        help="Prefix of the shard module file names (default: dag_shard)")
+    parser.add_argument("--check_configs", "--check-configs", action="store_true",
+                        help="Only validate the DAG configurations against the schemas of their templates, without "
+                             "generating any DAG file")
+    parser.add_argument("-dependency_index", "--dependency_index_file",
+                        help="Path to the dependency index JSON file recording the configuration, configuration layer "
+                             "and template files every DAG is generated from")
+    parser.add_argument("-changed_files", "--changed_files", nargs="+",
+                        help="Only generate the DAGs depending on these files according to the dependency index (and "
+                             "the DAGs missing from it)")
+    __add_dry_run_arg__(parser)
+    args = __parse_jobs_args__(parser, input_args)
+    if args.shards is not None and args.workers != 1:
+        parser.error("-shards can't be used with -workers")
+    if args.shards is not None and args.dependency_index_file:
+        parser.error("-shards can't be used with -dependency_index")
+    if args.changed_files and not args.dependency_index_file:
+        parser.error("-changed_files requires -dependency_index")
+    if args.dry_run and args.workers != 1:
+        parser.error("--dry_run can't be used with -workers")
+    return args
+
+
+def __run_batch__(input_args):
+    runtime_args = __get_batch_args__(input_args)
+    if runtime_args.check_configs:
+        __check_configs__(runtime_args)
+        return
+    # With a dry run, the diffs are the only output, so that they can be redirected to a patch file
+    diff_stream = sys.stdout if runtime_args.dry_run else None
+    if diff_stream is None:
+        print("Starting the Airflow DAG file Generation")
+    with __instrumentation__(runtime_args), __validation_pool__(runtime_args) as validation_pool:
+        if runtime_args.shards is not None:
+            # Imported here as the shards module depends on this one
+            from .shards import generate_dag_shards
+
+            results = generate_dag_shards(__get_jobs__(runtime_args), runtime_args.shards,
+                                          shard_file_prefix=runtime_args.shard_file_prefix,
+                                          validate=not runtime_args.no_validate,
+                                          build_cache_file=runtime_args.build_cache_file,
+                                          bytecode_cache_dir=runtime_args.bytecode_cache_dir,
+                                          output_manifest_file=runtime_args.output_manifest_file,
+                                          validation_pool=validation_pool, diff_stream=diff_stream)
+        else:
+            jobs = __get_jobs__(runtime_args)
+            if runtime_args.changed_files:
+                jobs = get_affected_jobs(jobs, load_dependency_index(runtime_args.dependency_index_file),
+                                         runtime_args.changed_files)
+            results = generate_dags(jobs, validate=not runtime_args.no_validate,
+                                    workers=runtime_args.workers, build_cache_file=runtime_args.build_cache_file,
+                                    bytecode_cache_dir=runtime_args.bytecode_cache_dir,
+                                    output_manifest_file=runtime_args.output_manifest_file,
+                                    validation_pool=validation_pool, diff_stream=diff_stream,
+                                    dependency_index_file=runtime_args.dependency_index_file)
+    if diff_stream is not None:
+        __exit_dry_run__(results)
+        return
+    __print_results__(results)
+    failures = [result for result in results if result.error]
+    if failures:
+        raise SystemExit("{0} of {1} DAGs failed".format(len(failures), len(results)))
+    print("Successfully Generated the {} Airflow DAG Python files".format(len(results)))
+
+
+def __exit_dry_run__(results):
+    failures = [result for result in results if result.error]
+    for result in failures:
+        print("FAILED '{0}' ({1}): {2}".format(result.output_dag_file, result.config_file, result.error),
+              file=sys.stderr)
+    if failures:
+        raise SystemExit("{0} of {1} DAGs failed".format(len(failures), len(results)))
+    changed_files = {result.output_dag_file for result in results if result.changed}
+    if changed_files:
+        raise SystemExit("{0} Airflow DAG Python files would change".format(len(changed_files)))
+
+
+def __check_configs__(runtime_args):
+    print("Validating the Airflow DAG configurations")
+    jobs = list(__get_jobs__(runtime_args))
+    with __instrumentation__(runtime_args):
+        config_errors = check_configs(jobs, bytecode_cache_dir=runtime_args.bytecode_cache_dir)
+    for config_file, error in config_errors.items():
+        print("INVALID '{0}': {1}".format(config_file, error))
+    if config_errors:
+        raise SystemExit("{0} of {1} DAG configurations are invalid".format(len(config_errors), len(jobs)))
+    print("Successfully Validated the {} Airflow DAG configurations".format(len(jobs)))
+
+
+def __get_affected_args__(input_args):
+    parser = argparse.ArgumentParser(prog='airflowdaggenerator affected',
+                                     description="Airflow DAG Generator (airflowdaggenerator.py) affected DAGs query::")
+    parser.add_argument("-dependency_index", "--dependency_index_file", required=True,
+                        help="Path to the dependency index JSON file recorded by the batch mode")
+    parser.add_argument("changed_files", nargs="+",
+                        help="Paths to the changed configuration, configuration layer or template files")
     return parser.parse_args(input_args)
 
 
+def __run_affected__(input_args):
+    runtime_args = __get_affected_args__(input_args)
+    dependency_index = load_dependency_index(runtime_args.dependency_index_file)
+    if not dependency_index:
+        raise SystemExit("The dependency index '{0}' is missing or empty".format(runtime_args.dependency_index_file))
+    for output_dag_file in get_affected_dag_files(dependency_index, runtime_args.changed_files):
+        print(output_dag_file)
+
+
+def __get_watch_args__(input_args):
+    parser = __get_jobs_parser__('airflowdaggenerator watch',
+                                 "Airflow DAG Generator (airflowdaggenerator.py) watch mode::")
+    parser.add_argument("-interval", "--interval", type=float, default=1.0,
+                        help="Number of seconds between two checks for changes (default: 1)")
+    parser.add_argument("--polling", action="store_true",
+                        help="Poll the configuration and template folders even when watchdog is installed")
+    return __parse_jobs_args__(parser, input_args)
+
+
+def __run_watch__(input_args):
+    # Imported here as the watch module depends on this one
+    from .watch import watch
+
+    runtime_args = __get_watch_args__(input_args)
+    print("Watching the Airflow DAG configuration and template files for changes")
+    with __instrumentation__(runtime_args), __validation_pool__(runtime_args) as validation_pool:
+        watch(lambda: list(__get_jobs__(runtime_args)), __print_results__, validate=not runtime_args.no_validate,
+              interval=runtime_args.interval, bytecode_cache_dir=runtime_args.bytecode_cache_dir,
+              use_polling=runtime_args.polling, validation_pool=validation_pool)
+
+
+def __run_single__(runtime_args):
+    if runtime_args.dry_run:
+        if generate_dag(runtime_args.input_config_yaml_path,
+                        runtime_args.input_config_yaml_file_name,
+                        runtime_args.input_template_path,
+                        runtime_args.input_template_file_name,
+                        runtime_args.output_dag_path,
+                        runtime_args.output_dag_file_name,
+                        config_layers=runtime_args.config_layers,
+                        diff_stream=sys.stdout):
+            raise SystemExit("The Airflow DAG Python file '{0}' would change".format(runtime_args.output_dag_file_name))
+        return
+    if not runtime_args.validate_only:
+        print("Starting the Airflow DAG file Generation")
+        generate_dag(runtime_args.input_config_yaml_path,
+                     runtime_args.input_config_yaml_file_name,
+                     runtime_args.input_template_path,
+                     runtime_args.input_template_file_name,
+                     runtime_args.output_dag_path,
+                     runtime_args.output_dag_file_name,
+                     runtime_args.bytecode_cache_dir,
+                     runtime_args.config_layers)
+        print("Successfully Generated the Airflow DAG Python file under '{0}'".format(runtime_args.output_dag_path))
+    if not runtime_args.no_validate:
+        with __validation_pool__(runtime_args) as validation_pool:
+            validate_dag(runtime_args.output_dag_path + os.path.sep + runtime_args.output_dag_file_name,
+                         validation_pool)
+        print("Successfully Validated the generated Airflow DAG Python file")
+
+
 def main():
     """
     The entry point for the Airflow DAG Generator. It orchestrates the validation of user provided inputs , generation
-    of the output DAG file and the validation of the generated DAG file.
+    of the output DAG file and the validation of the generated DAG file. When the first argument is "batch", all the
+    DAGs of a manifest or a folder of YAML configuration files are generated in one process instead, and when it is
+    "watch" they are regenerated every time their configuration or template files change. When it is "affected", the
+    DAG files depending on the given files according to a dependency index are printed.
 
     :returns: None
 
     :raises ValueError: when the user provided input is invalid. For example, if the output dag file name provided is not a .py file or the input YAML config file doesn't contain any parameters or is invalid
     :raises AssertionError: when there is validation error on the generated DAG files
     """
+    if sys.argv[1:2] == ['batch']:
+        __run_batch__(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['watch']:
+        __run_watch__(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ['affected']:
+        __run_affected__(sys.argv[2:])
+        return
+
     runtime_args = __get_args__(sys.argv[1:])
-    print("Starting the Airflow DAG file Generation")
-    generate_dag(runtime_args.input_config_yaml_path,
-                 runtime_args.input_config_yaml_file_name,
-                 runtime_args.input_template_path,
-                 runtime_args.input_template_file_name,
-                 runtime_args.output_dag_path,
-                 runtime_args.output_dag_file_name)
-    print("Successfully Generated the Airflow DAG Python file under '{0}'".format(runtime_args.output_dag_path))
-    validate_dag(runtime_args.output_dag_path)
-    print("Successfully Validated the generated Airflow DAG Python file")
+    with __instrumentation__(runtime_args):
+        __run_single__(runtime_args)
+
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+
+from . import __version__
+from .output import write_if_changed
+from .templates import get_template_sources
+
+
+def compute_build_key(config_content, env, template_name):
+    """
+    Computes the build key of a DAG, a hash of everything its generated file depends on: the content of the
+    configuration, the sources of the template and of the templates it references, and the generator version.
+
+    :param config_content: Content of the DAG configuration (bytes)
+    :param env: jinja2.Environment to load the templates with
+    :param template_name: Name of the DAG Jinja2 Template file
+
+    :returns: hex digest of the build key
+
+    :raises jinja2.exceptions.TemplateNotFound: when the template or one of its references doesn't exist
+    """
+    digest = hashlib.sha256(__version__.encode())
+    digest.update(hashlib.sha256(config_content).digest())
+    for name, source in sorted(get_template_sources(env, template_name).items()):
+        digest.update(hashlib.sha256(name.encode()).digest())
+        digest.update(hashlib.sha256(source.encode()).digest())
+    return digest.hexdigest()
+
+
+def load_build_cache(cache_file):
+    """
+    Loads the build cache, a mapping of generated DAG file path to the build key it was generated with and whether it
+    was validated, see record_build.
+
+    :param cache_file: Path to the build cache JSON file
+
+    :returns: dictionary of generated DAG file path to build entry, empty when the cache file doesn't exist or is
+     corrupt
+    """
+    try:
+        with open(cache_file) as cache:
+            build_cache = json.load(cache)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return build_cache if isinstance(build_cache, dict) else {}
+
+
+def save_build_cache(cache_file, build_cache):
+    """
+    Saves the build cache, replacing the cache file atomically so that an interrupted run never leaves it corrupt, see
+    output.write_if_changed.
+
+    :param cache_file: Path to the build cache JSON file
+    :param build_cache: dictionary of generated DAG file path to build entry
+
+    :returns: None
+    """
+    write_if_changed(cache_file, json.dumps(build_cache, indent=1, sort_keys=True))
+
+
+def is_up_to_date(build_cache, output_dag_file, build_key, validate=False):
+    """
+    Returns whether the generated DAG file exists and was generated with the given build key. When the DAG file is to be
+    validated, a DAG file generated without being validated isn't up to date, so that it gets validated.
+    """
+    build_entry = build_cache.get(os.path.abspath(output_dag_file))
+    return (isinstance(build_entry, dict) and build_entry.get('build_key') == build_key and
+            (build_entry.get('validated') or not validate) and os.path.isfile(output_dag_file))
+
+
+def record_build(build_cache, output_dag_file, build_key, validated):
+    """Records into the build cache the build key the DAG file was generated with, and whether it was validated."""
+    build_cache[os.path.abspath(output_dag_file)] = {'build_key': build_key, 'validated': validated}
@@ -0,0 +1,130 @@
+import json
+import os
+from functools import lru_cache
+
+import yaml
+
+try:
+    # libyaml based loader, much faster than the pure Python one
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+
+
+def iter_configs(config_file):
+    """
+    Lazily yields the DAG configurations of a configuration file, one at a time, so that a file describing thousands
+    of DAGs is never fully loaded in memory. A YAML file holds one DAG configuration per document (documents are
+    separated by ---), and a JSON Lines file (.jsonl or .ndjson extension) holds one per line. Empty documents and
+    blank lines are skipped.
+
+    :param config_file: Path to the DAG configuration input YAML or JSON Lines file, or an already opened text stream
+     (read as JSON Lines when its name has a JSON Lines extension, as YAML otherwise)
+
+    :returns: generator of DAG configurations
+
+    :raises ValueError: when a line of a JSON Lines file isn't valid JSON
+    :raises yaml.YAMLError: when a document of a YAML file isn't valid YAML
+    """
+    if not isinstance(config_file, str):
+        yield from _iter_stream_configs(config_file, str(getattr(config_file, 'name', '')))
+        return
+    with open(config_file) as configs:
+        yield from _iter_stream_configs(configs, config_file)
+
+
+def _iter_stream_configs(configs, name):
+    if name.endswith(JSON_LINES_EXTENSIONS):
+        for line in configs:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        for document in yaml.load_all(configs, Loader=SafeLoader):
+            if document is not None:
+                yield document
+
+
+def load_config(config_file):
+    """
+    Loads the configuration of a single DAG from a configuration file, see iter_configs.
+
+    :param config_file: Path to the DAG configuration input YAML or JSON Lines file, or an already opened text stream
+
+    :returns: the DAG configuration
+
+    :raises ValueError: when the file doesn't contain any DAG configuration or contains more than one
+    """
+    configs = iter_configs(config_file)
+    try:
+        config = next(configs, None)
+        if config is None:
+            raise ValueError("Invalid input configuration YML file")
+        if next(configs, None) is not None:
+            raise ValueError("Input configuration file contains more than one DAG configuration. Use the batch mode "
+                             "with -config_stream to generate a DAG for each of them")
+    finally:
+        configs.close()
+    return config
+
+
+def merge_configs(base_config, config):
+    """
+    Deep merges a DAG configuration over a base configuration: the mappings present in both are merged key by key,
+    recursively, and any other value of the configuration (including lists) replaces the one of the base
+    configuration. Neither configuration is modified, but the returned configuration shares the values it didn't merge
+    with them.
+
+    :param base_config: the base configuration dictionary, like the defaults shared by a team
+    :param config: the configuration dictionary overriding the base configuration
+
+    :returns: the merged configuration dictionary
+    """
+    merged_config = dict(base_config)
+    for key, value in config.items():
+        base_value = merged_config.get(key)
+        if isinstance(base_value, dict) and isinstance(value, dict):
+            value = merge_configs(base_value, value)
+        merged_config[key] = value
+    return merged_config
+
+
+def load_config_layers(config_layer_files):
+    """
+    Loads and deep merges (see merge_configs) the given configuration layers, in order, for example the global
+    defaults, then the defaults of a team. Each layer file holds a single configuration mapping (see load_config).
+
+    The merged layers are memoized, as well as every prefix of them, so the layers shared by many DAGs are loaded and
+    merged once per process instead of once per DAG. A layer is loaded again as soon as its file changes. The returned
+    configuration is shared and must not be modified, merge the DAG configuration over it instead.
+
+    :param config_layer_files: list of paths to the configuration layer YAML or JSON Lines files, the last one taking
+     precedence
+
+    :returns: the merged configuration dictionary, empty when there isn't any layer
+
+    :raises ValueError: when a layer file doesn't contain a single configuration mapping
+    """
+    layers = []
+    for config_layer_file in config_layer_files:
+        config_layer_file = os.path.abspath(config_layer_file)
+        stat = os.stat(config_layer_file)
+        layers.append((config_layer_file, stat.st_mtime_ns, stat.st_size))
+    return _merge_config_layers(tuple(layers))
+
+
+@lru_cache(maxsize=256)
+def _merge_config_layers(layers):
+    if not layers:
+        return {}
+    return merge_configs(_merge_config_layers(layers[:-1]), _load_config_layer(*layers[-1]))
+
+
+@lru_cache(maxsize=256)
+def _load_config_layer(config_layer_file, mtime, size):
+    # The modification time and size are part of the cache key, so a changed layer file is loaded again
+    config_layer = load_config(config_layer_file)
+    if not isinstance(config_layer, dict):
+        raise ValueError("Invalid configuration layer file {}. It should contain a mapping".format(config_layer_file))
+    return config_layer
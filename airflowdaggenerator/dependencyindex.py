@@ -0,0 +1,143 @@
+import json
+import os
+
+from jinja2 import TemplateNotFound
+
+from .output import write_if_changed
+from .templates import get_template_environment, get_template_files, get_template_search_path
+
+
+def get_job_dependencies(job, bytecode_cache_dir=None):
+    """
+    Returns the files the DAG of a batch generation job is generated from: its configuration file, its configuration
+    layer files and its template files (including the included, extended and imported ones).
+
+    :param job: batch generation job dictionary, see generate_dags
+    :param bytecode_cache_dir: Path to the folder to persist the compiled Jinja2 templates in, None disables it
+
+    :returns: set of absolute file paths
+    """
+    if 'config' in job:
+        config_file = job['config_source'].rsplit('#', 1)[0]
+    else:
+        config_file = job['input_config_yaml_path'] + os.path.sep + job['input_config_yaml_file_name']
+    dependencies = {os.path.abspath(config_file)}
+    dependencies.update(os.path.abspath(config_layer_file) for config_layer_file in job.get('config_layers') or [])
+    try:
+        template_files = get_template_files(get_template_environment(job['input_template_path'], bytecode_cache_dir),
+                                            job['input_template_file_name']).values()
+    except TemplateNotFound:
+        # Regenerate the DAG once the (missing) template is created, in any folder of the search path
+        template_files = [os.path.join(template_folder, job['input_template_file_name'])
+                          for template_folder in get_template_search_path(job['input_template_path'])]
+    dependencies.update(os.path.abspath(template_file) for template_file in template_files)
+    return dependencies
+
+
+def load_dependency_index(index_file):
+    """
+    Loads the dependency index, a mapping of generated DAG file path to the files it was generated from, see
+    get_job_dependencies.
+
+    :param index_file: Path to the dependency index JSON file
+
+    :returns: dictionary of generated DAG file path to the sorted list of its dependencies, empty when the index file
+     doesn't exist or is corrupt
+    """
+    try:
+        with open(index_file) as index:
+            dependency_index = json.load(index)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return dependency_index if isinstance(dependency_index, dict) else {}
+
+
+def save_dependency_index(index_file, dependency_index):
+    """
+    Saves the dependency index, replacing the index file atomically, see output.write_if_changed.
+
+    :param index_file: Path to the dependency index JSON file
+    :param dependency_index: dictionary of generated DAG file path to the list of its dependencies
+
+    :returns: None
+    """
+    write_if_changed(index_file, json.dumps(dependency_index, indent=1, sort_keys=True))
+
+
+def update_dependency_index(dependency_index, jobs, bytecode_cache_dir=None):
+    """
+    Records the dependencies of the DAGs of the given batch generation jobs into the dependency index. A DAG whose
+    dependencies can't be discovered (for example because of a syntax error in one of its templates) is removed from
+    the index, so that it is reported as affected by any change until it is generated again.
+
+    :param dependency_index: dictionary of generated DAG file path to the list of its dependencies, updated in place
+    :param jobs: iterable of batch generation job dictionaries, see generate_dags
+    :param bytecode_cache_dir: Path to the folder to persist the compiled Jinja2 templates in, None disables it
+
+    :returns: None
+    """
+    for job in jobs:
+        record_dependencies(dependency_index, job, get_recorded_dependencies(job, bytecode_cache_dir))
+
+
+def get_recorded_dependencies(job, bytecode_cache_dir=None):
+    """
+    Returns the dependencies of the DAG of a batch generation job as recorded into the dependency index, see
+    get_job_dependencies.
+
+    :returns: sorted list of absolute file paths, None when they can't be discovered
+    """
+    try:
+        return sorted(get_job_dependencies(job, bytecode_cache_dir))
+    except Exception:
+        return None
+
+
+def record_dependencies(dependency_index, job, dependencies):
+    """
+    Records the dependencies of the DAG of a batch generation job (see get_recorded_dependencies) into the dependency
+    index, removing the DAG from it when they are None.
+    """
+    if dependencies is None:
+        dependency_index.pop(get_output_dag_file(job), None)
+    else:
+        dependency_index[get_output_dag_file(job)] = dependencies
+
+
+def get_affected_dag_files(dependency_index, changed_files):
+    """
+    Answers "what regenerates if I change these files?": returns the generated DAG files depending on any of the given
+    configuration, configuration layer or template files, directly or through an included, extended or imported
+    template.
+
+    :param dependency_index: dictionary of generated DAG file path to the list of its dependencies, see
+     load_dependency_index
+    :param changed_files: iterable of paths to the changed files
+
+    :returns: sorted list of the absolute paths of the affected DAG files
+    """
+    changed_files = {os.path.abspath(changed_file) for changed_file in changed_files}
+    return sorted(output_dag_file for output_dag_file, dependencies in dependency_index.items()
+                  if not changed_files.isdisjoint(dependencies))
+
+
+def get_affected_jobs(jobs, dependency_index, changed_files):
+    """
+    Filters the batch generation jobs down to the ones whose DAG has to be regenerated after the given files changed:
+    the jobs whose DAG depends on any of them (see get_affected_dag_files) and the jobs missing from the dependency
+    index, like the newly added ones.
+
+    :param jobs: iterable of batch generation job dictionaries, see generate_dags
+    :param dependency_index: dictionary of generated DAG file path to the list of its dependencies
+    :param changed_files: iterable of paths to the changed files
+
+    :returns: generator of the affected jobs, in the same order. The jobs are consumed lazily
+    """
+    affected_dag_files = set(get_affected_dag_files(dependency_index, changed_files))
+    return (job for job in jobs if get_output_dag_file(job) in affected_dag_files or
+            get_output_dag_file(job) not in dependency_index)
+
+
+def get_output_dag_file(job):
+    """Returns the absolute path of the DAG file generated by a batch generation job, the key of the index."""
+    return os.path.abspath(job['output_dag_path'] + os.path.sep + job['output_dag_file_name'])
@@ -0,0 +1,140 @@
+import json
+import socket
+import time
+from contextlib import contextmanager
+
+_hooks = []
+
+
+def add_hook(hook):
+    """
+    Registers a hook receiving the instrumentation events of the generator stages. An event is a dictionary holding
+    the "stage" (config_load, schema_validate, template_compile, render, write, diff, static_validate or dagbag_import),
+    the "dag" (name of the generated DAG file), its "start" timestamp, its duration in "seconds" and, depending on the
+    stage, the number of "bytes" read or written and whether the DAG file "changed".
+
+    :param hook: callable receiving each event dictionary, see JsonLinesExporter and StatsdExporter
+
+    :returns: None
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """
+    Unregisters a hook registered with add_hook.
+
+    :param hook: the registered callable
+
+    :returns: None
+    """
+    _hooks.remove(hook)
+
+
+def emit(event):
+    """Sends the event to all the registered hooks."""
+    for hook in list(_hooks):
+        hook(event)
+
+
+@contextmanager
+def measure(stage, dag):
+    """
+    Measures the duration of the stage of a DAG and emits it to the registered hooks. The yielded event dictionary can
+    be completed with more fields (like "bytes") by the measured code. Nothing is measured when no hook is registered.
+
+    :param stage: name of the measured stage
+    :param dag: name of the generated DAG file
+
+    :returns: context manager yielding the event dictionary
+    """
+    if not _hooks:
+        yield {}
+        return
+    event = {'stage': stage, 'dag': dag, 'start': time.time()}
+    start = time.perf_counter()
+    try:
+        yield event
+    finally:
+        event['seconds'] = time.perf_counter() - start
+        emit(event)
+
+
+def has_hooks():
+    """Returns whether any hook is registered, see add_hook."""
+    return bool(_hooks)
+
+
+@contextmanager
+def collect_events(collect=None):
+    """
+    Collects the events emitted within the context instead of sending them to the registered hooks, so that a worker
+    process can hand them over to the parent process.
+
+    :param collect: whether to collect the events. The parent process tells its workers, as a worker started with the
+     spawn start method (the default on macOS and Windows) doesn't inherit the hooks of the parent process. None
+     collects them when a hook is registered in the current process
+
+    :returns: context manager yielding the list of collected events, or None when they aren't collected
+    """
+    if not (has_hooks() if collect is None else collect):
+        yield None
+        return
+    registered_hooks = list(_hooks)
+    events = []
+    _hooks[:] = [events.append]
+    try:
+        yield events
+    finally:
+        _hooks[:] = registered_hooks
+
+
+class JsonLinesExporter(object):
+    """
+    Instrumentation hook writing every event as a line of JSON.
+
+    :param output: Path to the JSON Lines file to append the events to, or an already opened text stream
+    """
+
+    def __init__(self, output):
+        self.stream = open(output, 'a') if isinstance(output, str) else output
+        self.owns_stream = isinstance(output, str)
+
+    def __call__(self, event):
+        self.stream.write(json.dumps(event, sort_keys=True) + '\n')
+
+    def close(self):
+        if self.owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class StatsdExporter(object):
+    """
+    Instrumentation hook sending every event to a StatsD server over UDP, as a timer of the stage duration and, when
+    the stage read or wrote bytes, a counter of the bytes. The metrics are named <prefix>.<stage>.duration and
+    <prefix>.<stage>.bytes.
+
+    :param host: Host name of the StatsD server
+    :param port: UDP port of the StatsD server
+    :param prefix: Prefix of the metric names
+    """
+
+    def __init__(self, host='localhost', port=8125, prefix='airflowdaggenerator'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def __call__(self, event):
+        metrics = ['{}.{}.duration:{:.3f}|ms'.format(self.prefix, event['stage'], event['seconds'] * 1000)]
+        if 'bytes' in event:
+            metrics.append('{}.{}.bytes:{}|c'.format(self.prefix, event['stage'], event['bytes']))
+        try:
+            self.socket.sendto('\n'.join(metrics).encode(), self.address)
+        except OSError:
+            # Metrics are best effort, an unreachable StatsD server must not fail the generation
+            pass
+
+    def close(self):
+        self.socket.close()
@@ -0,0 +1,145 @@
+import difflib
+import hashlib
+import json
+import os
+import uuid
+
+
+def write_if_changed(output_file, content):
+    """
+    Atomically writes the content to the output file, unless the file already holds exactly this content. The content
+    is written to a temporary file of the same folder, flushed to disk and renamed over the output file, so a reader
+    (like the Airflow scheduler) never sees a partially written file. Leaving an unchanged file untouched keeps its
+    modification time, so the Airflow scheduler doesn't parse it again.
+
+    :param output_file: Path to the output file
+    :param content: Content to write, str (written as UTF-8) or bytes
+
+    :returns: True when the file was written, False when it was left untouched
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    if _has_content(output_file, data):
+        return False
+
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    file_descriptor, temp_file = _create_temp_file(output_dir, os.path.basename(output_file))
+    try:
+        with os.fdopen(file_descriptor, 'wb') as temp:
+            temp.write(data)
+            temp.flush()
+            os.fsync(temp.fileno())
+        try:
+            os.chmod(temp_file, os.stat(output_file).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(temp_file, output_file)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    _fsync_directory(output_dir)
+    return True
+
+
+def write_diff(output_file, content, stream):
+    """
+    Writes the unified diff between the output file and the content to the stream, as it is computed, without writing
+    the output file. A missing output file is diffed as /dev/null.
+
+    :param output_file: Path to the output file
+    :param content: Content the output file would be written with, str or bytes (UTF-8 encoded)
+    :param stream: text stream to write the diff to, like sys.stdout
+
+    :returns: True when the content differs from the output file, False when the file already holds exactly this content
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    if _has_content(output_file, data):
+        return False
+    try:
+        with open(output_file, encoding='utf-8') as existing_file:
+            existing_lines = existing_file.readlines()
+        from_file = output_file
+    except FileNotFoundError:
+        existing_lines, from_file = [], '/dev/null'
+    for line in difflib.unified_diff(existing_lines, data.decode('utf-8').splitlines(True), from_file, output_file):
+        stream.write(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n')
+    return True
+
+
+def compute_hash(content):
+    """Returns the SHA-256 hex digest of the content, str (encoded as UTF-8) or bytes."""
+    return hashlib.sha256(content.encode('utf-8') if isinstance(content, str) else content).hexdigest()
+
+
+def load_output_manifest(manifest_file):
+    """
+    Loads the output manifest, a mapping of generated file path (relative to the manifest folder) to the SHA-256 hex
+    digest of its content, which lets sync tooling find the changed files without reading all of them.
+
+    :param manifest_file: Path to the output manifest JSON file
+
+    :returns: dictionary of generated file path to content hash, empty when the manifest doesn't exist or is corrupt
+    """
+    try:
+        with open(manifest_file) as manifest:
+            output_manifest = json.load(manifest)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return output_manifest if isinstance(output_manifest, dict) else {}
+
+
+def update_output_manifest(manifest_file, output_hashes):
+    """
+    Records the content hashes of the given generated files into the output manifest, keeping the entries of the other
+    files.
+
+    :param manifest_file: Path to the output manifest JSON file
+    :param output_hashes: dictionary of generated file path to content hash, a None hash removes the file entry
+
+    :returns: None
+    """
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_file))
+    output_manifest = load_output_manifest(manifest_file)
+    for output_file, output_hash in output_hashes.items():
+        relative_path = os.path.relpath(os.path.abspath(output_file), manifest_dir)
+        if output_hash is None:
+            output_manifest.pop(relative_path, None)
+        else:
+            output_manifest[relative_path] = output_hash
+    write_if_changed(manifest_file, json.dumps(output_manifest, indent=1, sort_keys=True) + '\n')
+
+
+def _has_content(output_file, data):
+    try:
+        if os.path.getsize(output_file) != len(data):
+            return False
+        with open(output_file, 'rb') as existing_file:
+            return existing_file.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def _create_temp_file(output_dir, output_file_name):
+    # Created like open does, the umask being applied by the OS, so that a new output file gets the usual permissions
+    # (unlike tempfile.mkstemp, which creates the file readable by its owner only)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        temp_file = os.path.join(output_dir, '.{}.{}.tmp'.format(output_file_name, uuid.uuid4().hex[:8]))
+        try:
+            return os.open(temp_file, flags, 0o666), temp_file
+        except FileExistsError:
+            continue
+
+
+def _fsync_directory(directory):
+    # Persists the rename itself, not supported on every platform (like Windows)
+    try:
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directory_descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_descriptor)
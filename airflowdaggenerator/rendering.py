@@ -0,0 +1,129 @@
+import os
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+
+from jinja2 import Environment, Template
+
+from . import instrumentation
+from .configs import iter_configs, load_config, load_config_layers, merge_configs
+from .output import compute_hash
+from .schemas import get_template_schema
+from .validation import TASK_ID_PATTERN
+
+RenderedDag = namedtuple('RenderedDag', ['dag_id', 'file_name', 'source', 'hash', 'timings'])
+RenderedDag.__doc__ = """
+DAG rendered in memory by render_dag. dag_id is the "dag_id" of its configuration (None when it has none), file_name
+the name of its DAG Py file, source the rendered Python source, hash the SHA-256 hex digest of the source (see
+output.compute_hash) and timings a dictionary of stage (config_load, schema_validate and render) to its duration in
+seconds.
+"""
+
+
+def render_dag(config, template, file_name=None, config_layers=None):
+    """
+    Renders a DAG in memory, without reading nor writing any file besides the configuration layers. The rendered DAG
+    can then be written by any of the sinks, see the sinks module, or pushed anywhere else as is.
+
+    The configuration is validated against the schema of the template before being rendered (see
+    schemas.get_template_schema) when the template was loaded from a template folder, for example with
+    templates.get_template_environment(path).get_template(name).
+
+    :param config: the DAG configuration dictionary, or a text stream holding it as YAML (or JSON Lines when the name
+     of the stream has a .jsonl extension), see configs.load_config
+    :param template: jinja2.Template to render the DAG with, or the source of the DAG Jinja2 Template, see
+     compile_template
+    :param file_name: name for the DAG Py file, None names it after the dag_id of the configuration
+    :param config_layers: list of paths to the configuration layer files the configuration is merged over, see
+     configs.load_config_layers. None (or an empty list) disables the layering
+
+    :returns: RenderedDag
+
+    :raises ValueError: when the configuration is invalid or doesn't match the schema of the template, when the DAG
+     file name isn't a .py file name or contains a path separator, or when it is derived from a dag_id which isn't
+     made of alphanumeric characters, dashes, dots and underscores exclusively
+    """
+    timings = {}
+    if not isinstance(config, dict):
+        with _timed(timings, 'config_load', str(getattr(config, 'name', '<stream>'))):
+            config = load_config(config)
+    if config_layers:
+        config = merge_configs(load_config_layers(config_layers), config)
+    dag_id = config.get('dag_id') if isinstance(config, dict) else None
+    if file_name is None:
+        # The DAG file name ends up in a folder, a tarball or a zip file, so a dag_id like ../dag must not escape it
+        if not isinstance(dag_id, str) or not TASK_ID_PATTERN.match(dag_id):
+            raise ValueError("Invalid DAG configuration. It should have a dag_id made of alphanumeric characters, "
+                             "dashes, dots and underscores exclusively when no DAG file name is given, got "
+                             "{!r}".format(dag_id))
+        file_name = '{}.py'.format(dag_id)
+    if not file_name.endswith('.py'):
+        raise ValueError("Invalid output dag file name. It should be a .py extension file")
+    if '/' in file_name or os.path.sep in file_name or (os.path.altsep and os.path.altsep in file_name):
+        raise ValueError("Invalid output dag file name {!r}. It shouldn't contain any path separator".format(file_name))
+    template = template if isinstance(template, Template) else compile_template(template)
+
+    with _timed(timings, 'schema_validate', file_name):
+        validate_config = (get_template_schema(template.environment, template.name)
+                           if template.name and template.environment.loader else None)
+        errors = validate_config(config) if validate_config else []
+    if errors:
+        raise ValueError("Invalid DAG configuration. Errors: {}".format('; '.join(errors)))
+
+    with _timed(timings, 'render', file_name):
+        source = template.render(config)
+    return RenderedDag(dag_id, file_name, source, compute_hash(source), timings)
+
+
+def render_dags(configs, template, config_layers=None):
+    """
+    Renders a DAG in memory for every configuration, see render_dag. The template is compiled once for all of them,
+    and every DAG Py file is named after the dag_id of its configuration.
+
+    :param configs: iterable of DAG configuration dictionaries, or a text stream holding them as YAML documents (or
+     JSON Lines), see configs.iter_configs
+    :param template: jinja2.Template to render the DAGs with, or the source of the DAG Jinja2 Template
+    :param config_layers: list of paths to the configuration layer files every configuration is merged over
+
+    :returns: list of RenderedDag, in the same order as the configurations
+
+    :raises ValueError: when a configuration is invalid, or two configurations have the same dag_id
+    """
+    if hasattr(configs, 'read'):
+        configs = iter_configs(configs)
+    template = template if isinstance(template, Template) else compile_template(template)
+    rendered_dags = [render_dag(config, template, config_layers=config_layers) for config in configs]
+    file_name_counts = Counter(rendered_dag.file_name for rendered_dag in rendered_dags)
+    duplicated_file_names = sorted(file_name for file_name, count in file_name_counts.items() if count > 1)
+    if duplicated_file_names:
+        raise ValueError("Invalid DAG configurations. Duplicated DAG file names: {}".format(duplicated_file_names))
+    return rendered_dags
+
+
+@lru_cache(maxsize=32)
+def compile_template(source):
+    """
+    Compiles the source of a DAG Jinja2 Template with the same options as the template folders (see
+    templates.get_template_environment). The compiled template is memoized, so rendering many DAGs with the same
+    source compiles it once. It can't include, extend nor import other templates, load it from a template folder for
+    that.
+
+    :param source: the Jinja2 Template source
+
+    :returns: jinja2.Template
+    """
+    return _get_string_environment().from_string(source)
+
+
+@lru_cache(maxsize=1)
+def _get_string_environment():
+    return Environment(trim_blocks=True, lstrip_blocks=True)
+
+
+@contextmanager
+def _timed(timings, stage, dag):
+    start = time.perf_counter()
+    with instrumentation.measure(stage, dag):
+        yield
+    timings[stage] = time.perf_counter() - start
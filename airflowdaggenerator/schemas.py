@@ -0,0 +1,234 @@
+import os
+import re
+from numbers import Number
+
+import yaml
+from jinja2 import TemplateNotFound
+
+from .configs import SafeLoader
+
+# The schema of a template is declared alongside it, in the same template folder, for example
+# sample_dag_template.py.j2.schema.yml
+SCHEMA_FILE_SUFFIX = '.schema.yml'
+
+TYPES = {
+    'string': lambda value: isinstance(value, str),
+    'integer': lambda value: isinstance(value, int) and not isinstance(value, bool),
+    'number': lambda value: isinstance(value, Number) and not isinstance(value, bool),
+    'boolean': lambda value: isinstance(value, bool),
+    'array': lambda value: isinstance(value, list),
+    'object': lambda value: isinstance(value, dict),
+    'null': lambda value: value is None,
+}
+
+_template_schemas = {}
+
+
+def compile_schema(schema):
+    """
+    Compiles a configuration schema into a validator function, so that it is parsed once and applied to any number of
+    configurations. The schema is a mapping following a subset of JSON Schema:
+
+    - type: one of string, integer, number, boolean, array, object and null, or a list of them
+    - enum: list of the allowed values
+    - properties, required and additionalProperties (true or false) for the objects
+    - items, minItems and maxItems for the arrays
+    - minLength, maxLength and pattern for the strings
+    - minimum and maximum for the numbers
+
+    Sample schema::
+
+        type: object
+        required: [dag_id, email_list]
+        properties:
+          dag_id: {type: string, pattern: '^[\\w.-]+$'}
+          email_list: {type: array, items: {type: string, minLength: 1}}
+
+    :param schema: the schema mapping
+
+    :returns: function taking a configuration and returning the list of its errors, each of them prefixed with the
+     path of the invalid value (for example "email_list[2]: None is not of type 'string'"), empty when it is valid
+
+    :raises ValueError: when the schema is invalid
+    """
+    checks = _compile_checks(schema, '(schema)')
+
+    def validate(config):
+        errors = []
+        _apply_checks(checks, config, '', errors)
+        return errors
+
+    return validate
+
+
+def get_template_schema(env, template_name):
+    """
+    Returns the compiled schema (see compile_schema) declared alongside the given template, as a YAML file named after
+    the template with the SCHEMA_FILE_SUFFIX suffix and looked up in the template folders. The compiled schema is
+    memoized for the lifetime of the process and compiled again when its file changes. A missing schema is memoized as
+    well, and looked up again when a file is added to (or removed from) the folders it would be found in.
+
+    :param env: jinja2.Environment the template is loaded with
+    :param template_name: Name of the DAG Jinja2 Template file
+
+    :returns: the validator function, or None when the template has no schema
+
+    :raises ValueError: when the schema is invalid
+    """
+    schema_name = template_name + SCHEMA_FILE_SUFFIX
+    template_schema = _template_schemas.get((env, schema_name))
+    if template_schema is not None and template_schema[1]():
+        return template_schema[0]
+    try:
+        source, filename, uptodate = env.loader.get_source(env, schema_name)
+    except TemplateNotFound:
+        validate, uptodate = None, _get_missing_schema_uptodate(env, schema_name)
+    else:
+        try:
+            validate = compile_schema(yaml.load(source, Loader=SafeLoader))
+        except ValueError as error:
+            raise ValueError("Invalid schema file {}: {}".format(filename, error))
+    _template_schemas[(env, schema_name)] = (validate, uptodate or (lambda: True))
+    return validate
+
+
+def _get_missing_schema_uptodate(env, schema_name):
+    """
+    Returns a function telling whether a missing schema is still missing, by comparing the modification times of the
+    folders it would be found in, so that the schema isn't looked up again in every template folder for every DAG.
+    """
+    template_folders = getattr(env.loader, 'searchpath', None)
+    if template_folders is None:
+        return lambda: False
+    schema_folders = [os.path.dirname(os.path.join(template_folder, schema_name))
+                      for template_folder in template_folders]
+
+    def get_modification_times():
+        modification_times = []
+        for schema_folder in schema_folders:
+            try:
+                modification_times.append(os.stat(schema_folder).st_mtime_ns)
+            except OSError:
+                modification_times.append(None)
+        return modification_times
+
+    modification_times = get_modification_times()
+    return lambda: get_modification_times() == modification_times
+
+
+def _compile_checks(schema, path):
+    """Compiles the schema into a list of check functions, each of them appending its errors to the given list."""
+    if not isinstance(schema, dict):
+        raise ValueError("{}: the schema should be a mapping".format(path))
+    checks = []
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        unknown_types = [schema_type for schema_type in types if schema_type not in TYPES]
+        if unknown_types:
+            raise ValueError("{}: unknown types {}".format(path, unknown_types))
+        type_checks = [TYPES[schema_type] for schema_type in types]
+        expected = repr(types[0]) if len(types) == 1 else 'any of {}'.format(types)
+
+        def check_type(value, value_path, errors):
+            if not any(type_check(value) for type_check in type_checks):
+                errors.append('{}: {!r} is not of type {}'.format(_display_path(value_path), value, expected))
+                return False
+            return True
+
+        checks.append(check_type)
+    if 'enum' in schema:
+        allowed_values = schema['enum']
+
+        def check_enum(value, value_path, errors):
+            if value not in allowed_values:
+                errors.append('{}: {!r} is not one of {}'.format(_display_path(value_path), value, allowed_values))
+
+        checks.append(check_enum)
+    checks.extend(_compile_bound_checks(schema, path))
+    if 'pattern' in schema:
+        try:
+            pattern = re.compile(schema['pattern'])
+        except (re.error, TypeError) as error:
+            raise ValueError("{}: invalid pattern {!r}: {}".format(path, schema['pattern'], error))
+
+        def check_pattern(value, value_path, errors):
+            if isinstance(value, str) and not pattern.search(value):
+                errors.append('{}: {!r} does not match {!r}'.format(_display_path(value_path), value, pattern.pattern))
+
+        checks.append(check_pattern)
+    if 'properties' in schema or 'required' in schema or schema.get('additionalProperties') is False:
+        checks.append(_compile_object_check(schema, path))
+    if 'items' in schema:
+        item_checks = _compile_checks(schema['items'], path + '[]')
+
+        def check_items(value, value_path, errors):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    _apply_checks(item_checks, item, '{}[{}]'.format(value_path, index), errors)
+
+        checks.append(check_items)
+    return checks
+
+
+def _compile_bound_checks(schema, path):
+    bounds = [('minLength', str, len, '{}: {!r} is shorter than {}'),
+              ('maxLength', str, len, '{}: {!r} is longer than {}'),
+              ('minItems', list, len, '{}: {!r} has fewer than {} items'),
+              ('maxItems', list, len, '{}: {!r} has more than {} items'),
+              ('minimum', Number, None, '{}: {!r} is less than {}'),
+              ('maximum', Number, None, '{}: {!r} is greater than {}')]
+    checks = []
+    for keyword, value_type, measure, message in bounds:
+        if keyword not in schema:
+            continue
+        if not isinstance(schema[keyword], Number):
+            raise ValueError("{}: {} should be a number".format(path, keyword))
+        checks.append(_make_bound_check(keyword.startswith('min'), schema[keyword], value_type, measure, message))
+    return checks
+
+
+def _make_bound_check(is_minimum, bound, value_type, measure, message):
+    def check_bound(value, value_path, errors):
+        if not isinstance(value, value_type) or isinstance(value, bool):
+            return
+        measured_value = measure(value) if measure else value
+        if measured_value < bound if is_minimum else measured_value > bound:
+            errors.append(message.format(_display_path(value_path), value, bound))
+
+    return check_bound
+
+
+def _compile_object_check(schema, path):
+    property_checks = {name: _compile_checks(property_schema, _join_path(path, name))
+                       for name, property_schema in (schema.get('properties') or {}).items()}
+    required = list(schema.get('required') or [])
+    allows_additional_properties = schema.get('additionalProperties', True) is not False
+
+    def check_object(value, value_path, errors):
+        if not isinstance(value, dict):
+            return
+        for name in required:
+            if name not in value:
+                errors.append('{}: missing required property {!r}'.format(_display_path(value_path), name))
+        for name, item in value.items():
+            if name in property_checks:
+                _apply_checks(property_checks[name], item, _join_path(value_path, name), errors)
+            elif not allows_additional_properties:
+                errors.append('{}: unexpected property'.format(_join_path(value_path, name)))
+
+    return check_object
+
+
+def _apply_checks(checks, value, value_path, errors):
+    for check in checks:
+        # A value of the wrong type isn't checked any further, its other errors would only be noise
+        if check(value, value_path, errors) is False:
+            return
+
+
+def _display_path(path):
+    return path or '(root)'
+
+
+def _join_path(path, name):
+    return '{}.{}'.format(path, name) if path else str(name)
@@ -0,0 +1,254 @@
+import hashlib
+import os
+import re
+import tempfile
+import zlib
+from collections import OrderedDict
+
+from .airflowdaggenerator import (GenerationResult, _get_build_key, _get_config_file, _load_job_config, _render_dag,
+                                  get_import_errors)
+from .buildcache import is_up_to_date, load_build_cache, record_build, save_build_cache
+from .output import compute_hash, update_output_manifest, write_diff, write_if_changed
+from .validation import check_dag_source
+
+# Every DAG source is executed in its own namespace, so that the variables of the DAGs (like "dag") don't clash, and
+# the DAG objects it defines are exposed as globals of the shard module for the airflow DagBag to collect them. A DAG
+# failing to execute is logged and left out, so that it doesn't hide the other DAGs of its shard from the scheduler
+SHARD_MODULE_TEMPLATE = '''\
+# Generated by airflowdaggenerator, do not edit: shard {shard_number} of {shards}, holding {dag_count} DAG(s)
+import logging as _logging
+
+from airflow import DAG as _DAG
+
+_DAG_SOURCES = [
+{dag_sources}]
+
+
+def _load_dags(dag_sources):
+    dags = {{}}
+    for dag_file_name, dag_source in dag_sources:
+        namespace = {{'__name__': '_airflowdaggenerator_shard', '__file__': __file__}}
+        try:
+            exec(compile(dag_source, __file__, 'exec'), namespace)
+        except Exception:
+            _logging.getLogger(__name__).exception('Failed to load the DAG %s of the shard %s', dag_file_name,
+                                                   __file__)
+            continue
+        dags.update(('{{}}:{{}}'.format(dag_file_name, name), value) for name, value in namespace.items()
+                    if isinstance(value, _DAG))
+    return dags
+
+
+globals().update(_load_dags(_DAG_SOURCES))
+'''
+
+
+def get_shard_index(output_dag_file_name, shards):
+    """
+    Returns the shard a DAG belongs to. The mapping only depends on the name of the DAG and the number of shards, so a
+    DAG stays in the same shard across runs (and processes) whatever the other DAGs are.
+
+    :param output_dag_file_name: Name of the DAG Py file the DAG would be generated as on its own
+    :param shards: number of shards
+
+    :returns: index of the shard, from 0 to shards - 1
+    """
+    return zlib.crc32(output_dag_file_name.encode('utf-8')) % shards
+
+
+def get_shard_file_name(shard_file_prefix, shard_index, shards):
+    """Returns the name of the shard module, for example dag_shard_07.py for the shard 7 of 16."""
+    return '{0}_{1:0{2}d}.py'.format(shard_file_prefix, shard_index, len(str(shards - 1)))
+
+
+def render_shard_module(dag_sources, shard_index, shards):
+    """
+    Renders the shard module defining all the DAGs of the given DAG sources.
+
+    :param dag_sources: list of (DAG Py file name, rendered DAG source) tuples
+    :param shard_index: index of the shard
+    :param shards: number of shards
+
+    :returns: source of the shard module
+    """
+    return SHARD_MODULE_TEMPLATE.format(shard_number=shard_index + 1, shards=shards, dag_count=len(dag_sources),
+                                        dag_sources=''.join('    ({!r}, {!r}),\n'.format(dag_file_name, dag_source)
+                                                            for dag_file_name, dag_source in sorted(dag_sources)))
+
+
+def generate_dag_shards(jobs, shards, shard_file_prefix='dag_shard', validate=True, build_cache_file=None,
+                        bytecode_cache_dir=None, output_manifest_file=None, validation_pool=None, diff_stream=None):
+    """
+    Renders the DAGs of the given batch generation jobs (see generate_dags) into a fixed number of shard modules per
+    output folder instead of one DAG Py file per DAG, so that the airflow scheduler imports and parses a handful of
+    files instead of thousands. Every DAG goes to the shard given by get_shard_index, whatever the other jobs are, so
+    changing one DAG only rewrites its shard: the other shard files are left untouched (see output.write_if_changed)
+    and aren't parsed again by the scheduler. Every shard of an output folder is written, the shards without any DAG
+    being empty, so all the jobs of the output folder have to be given on every run. The shard files of the prefix left
+    over from a different number of shards are removed.
+
+    Each rendered DAG is statically validated (see validation.check_dag_source) and, unless validate is False,
+    imported on its own into airflow DagBag before being added to its shard, a DAG failing it being left out of the
+    shard and reported as failed. So a single invalid DAG never prevents the other DAGs of its shard from being
+    deployed, and a DAG failing at import time in the scheduler anyway is logged and skipped by the shard module.
+
+    With a build cache file, the shards whose DAGs are all unchanged since they were last successfully generated are
+    skipped: neither rendered, written nor validated. A shard generated without being validated isn't skipped when
+    validating.
+
+    With a diff stream (dry run), the unified diffs between the existing shard modules and the rendered ones are
+    written to the stream instead, like generate_dags does for the DAG files: nothing is written to disk (nor
+    removed) and the DAGs aren't validated.
+
+    :param jobs: iterable of job dictionaries, see generate_dags. The output_dag_file_name of a job names the DAG
+     within its shard
+    :param shards: number of shard modules to generate per output folder, the shards holding about
+     len(jobs) / shards DAGs each. Changing it moves the DAGs to other shards, the former shard files being removed
+    :param shard_file_prefix: prefix of the shard module file names, see get_shard_file_name. Any file of the output
+     folders named after the prefix and a shard number (like dag_shard_7.py) is considered to be a shard module
+    :param validate: whether to validate each DAG by leveraging airflow DagBag before adding it to its shard
+    :param build_cache_file: Path to the build cache JSON file, None disables the build cache
+    :param bytecode_cache_dir: Path to the folder to persist the compiled Jinja2 templates in, None disables it
+    :param output_manifest_file: Path to the output manifest JSON file recording the content hash of every shard
+     module (see output.update_output_manifest), None disables it
+    :param validation_pool: validationpool.ValidationPool importing the DAGs in isolated worker processes, None
+     imports them in the current process
+    :param diff_stream: text stream to write the diffs of the shard modules to instead of writing them, like
+     sys.stdout. None writes the shard modules
+
+    :returns: list of GenerationResult, in the same order as the jobs, their output_dag_file being the shard module
+
+    :raises ValueError: when the number of shards is less than 1
+    """
+    if shards < 1:
+        raise ValueError("Invalid number of shards. It should be 1 or more")
+    if diff_stream is not None:
+        validate = False
+        build_cache_file = bytecode_cache_dir = output_manifest_file = None
+    jobs = list(jobs)
+    build_cache = load_build_cache(build_cache_file) if build_cache_file else None
+    shard_jobs = OrderedDict()
+    for output_dag_path in OrderedDict.fromkeys(job['output_dag_path'] for job in jobs):
+        for shard_index in range(shards):
+            shard_file = output_dag_path + os.path.sep + get_shard_file_name(shard_file_prefix, shard_index, shards)
+            shard_jobs[shard_file] = (shard_index, [])
+    for position, job in enumerate(jobs):
+        shard_index = get_shard_index(job['output_dag_file_name'], shards)
+        shard_file = job['output_dag_path'] + os.path.sep + get_shard_file_name(shard_file_prefix, shard_index, shards)
+        shard_jobs[shard_file][1].append((position, job))
+
+    results = [None] * len(jobs)
+    output_hashes = {}
+    for shard_file, (shard_index, indexed_jobs) in shard_jobs.items():
+        shard_results, shard_key, output_hashes[shard_file] = _generate_shard(
+            shard_file, shard_index, shards, indexed_jobs, validate, build_cache, bytecode_cache_dir, validation_pool,
+            diff_stream)
+        for position, result in shard_results:
+            results[position] = result
+        if build_cache is not None:
+            if not shard_key:
+                build_cache.pop(os.path.abspath(shard_file), None)
+            elif output_hashes[shard_file] is not None:
+                # A skipped shard keeps its entry, and whether it was validated
+                record_build(build_cache, shard_file, shard_key, validate)
+
+    if diff_stream is None:
+        for output_dag_path in OrderedDict.fromkeys(job['output_dag_path'] for job in jobs):
+            for stale_shard_file in _remove_stale_shards(output_dag_path, shard_file_prefix, shard_jobs):
+                output_hashes[stale_shard_file] = None
+                if build_cache is not None:
+                    build_cache.pop(os.path.abspath(stale_shard_file), None)
+
+    if build_cache is not None:
+        save_build_cache(build_cache_file, build_cache)
+    if output_manifest_file:
+        update_output_manifest(output_manifest_file, {shard_file: output_hash
+                                                      for shard_file, output_hash in output_hashes.items()
+                                                      if output_hash or shard_file not in shard_jobs})
+    return results
+
+
+def _generate_shard(shard_file, shard_index, shards, indexed_jobs, validate, build_cache, bytecode_cache_dir,
+                    validation_pool, diff_stream=None):
+    """
+    Generates (and validates) a shard module, capturing the failure of every DAG into its GenerationResult. Returns the
+    (job position, GenerationResult) tuples along with the build key of the shard, which is None when the build cache is
+    disabled or a DAG failed, and the hash of the shard module, which is None when it was skipped.
+    """
+    errors = OrderedDict()
+    shard_key = None
+    if build_cache is not None:
+        digest = hashlib.sha256()
+        for position, job in sorted(indexed_jobs, key=lambda indexed_job: indexed_job[1]['output_dag_file_name']):
+            try:
+                digest.update('{}:{}\n'.format(job['output_dag_file_name'], _get_build_key(job, bytecode_cache_dir))
+                              .encode('utf-8'))
+            except Exception as exception:
+                errors[position] = '{}: {}'.format(type(exception).__name__, exception)
+        shard_key = digest.hexdigest()
+        if not errors and is_up_to_date(build_cache, shard_file, shard_key, validate):
+            return [(position, GenerationResult(_get_config_file(job), shard_file, None, True, False))
+                    for position, job in indexed_jobs], shard_key, None
+
+    rendered_sources = []
+    for position, job in indexed_jobs:
+        if position in errors:
+            continue
+        try:
+            dag_source = _render_dag(_load_job_config(job, bytecode_cache_dir), job['input_template_path'],
+                                     job['input_template_file_name'], job['output_dag_file_name'], bytecode_cache_dir)
+            static_errors = check_dag_source(dag_source, '{}#{}'.format(shard_file, job['output_dag_file_name']))
+            if static_errors:
+                errors[position] = 'DAG import failures. Errors: {}'.format(static_errors)
+            else:
+                rendered_sources.append((position, job['output_dag_file_name'], dag_source))
+        except Exception as exception:
+            errors[position] = '{}: {}'.format(type(exception).__name__, exception)
+    if validate and rendered_sources:
+        errors.update(_get_dag_import_errors(shard_file, rendered_sources, validation_pool))
+
+    dag_sources = [(dag_file_name, dag_source) for position, dag_file_name, dag_source in rendered_sources
+                   if position not in errors]
+    shard_source = render_shard_module(dag_sources, shard_index, shards)
+    if diff_stream is not None:
+        changed = write_diff(shard_file, shard_source, diff_stream)
+    else:
+        changed = write_if_changed(shard_file, shard_source)
+    results = [(position, GenerationResult(_get_config_file(job), shard_file, errors.get(position), False, changed))
+               for position, job in indexed_jobs]
+    if errors:
+        shard_key = None
+    return results, shard_key, compute_hash(shard_source)
+
+
+def _get_dag_import_errors(shard_file, rendered_sources, validation_pool):
+    """
+    Imports every rendered DAG on its own into airflow DagBag, from a temporary folder, before it is added to its shard.
+    Returns the import error of every failing DAG, keyed by job position.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        positions = {}
+        for position, dag_file_name, dag_source in rendered_sources:
+            dag_file = os.path.join(temp_dir, dag_file_name)
+            with open(dag_file, 'w', encoding='utf-8') as output_file:
+                output_file.write(dag_source)
+            positions[dag_file] = (position, dag_file_name)
+        try:
+            import_errors = get_import_errors(list(positions), validation_pool)
+        except Exception as exception:
+            error = '{}: {}'.format(type(exception).__name__, exception)
+            return {position: error for position, _ in positions.values()}
+    return {positions[dag_file][0]: 'DAG import failures. Errors: {}'.format(
+                {'{}#{}'.format(shard_file, positions[dag_file][1]): import_error})
+            for dag_file, import_error in import_errors.items() if dag_file in positions}
+
+
+def _remove_stale_shards(output_dag_path, shard_file_prefix, shard_files):
+    """Removes the shard modules of the prefix which aren't part of the given shard files, returning their paths."""
+    shard_file_pattern = re.compile(r'^{}_\d+\.py$'.format(re.escape(shard_file_prefix)))
+    stale_shard_files = [output_dag_path + os.path.sep + file_name for file_name in sorted(os.listdir(output_dag_path))
+                         if shard_file_pattern.match(file_name)]
+    stale_shard_files = [shard_file for shard_file in stale_shard_files if shard_file not in shard_files]
+    for stale_shard_file in stale_shard_files:
+        os.remove(stale_shard_file)
+    return stale_shard_files
@@ -0,0 +1,75 @@
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+from .output import write_if_changed
+
+
+def write_to_directory(rendered_dags, output_dag_path):
+    """
+    Writes the rendered DAGs (see rendering.render_dags) to a folder, one DAG Py file each. Every file is written
+    atomically and a file already holding its rendered DAG is left untouched, see output.write_if_changed.
+
+    :param rendered_dags: iterable of rendering.RenderedDag
+    :param output_dag_path: Path for the DAG Py files, created when missing
+
+    :returns: list of the paths of the written DAG files, without the unchanged ones
+    """
+    os.makedirs(output_dag_path, exist_ok=True)
+    written_files = []
+    for rendered_dag in rendered_dags:
+        output_dag_file = output_dag_path + os.path.sep + rendered_dag.file_name
+        if write_if_changed(output_dag_file, rendered_dag.source):
+            written_files.append(output_dag_file)
+    return written_files
+
+
+def write_to_tarball(rendered_dags, tarball, compression='gz', mtime=None):
+    """
+    Writes the rendered DAGs (see rendering.render_dags) to a tarball, one DAG Py file each at its root. A tarball file
+    is written atomically, see output.write_if_changed.
+
+    :param rendered_dags: iterable of rendering.RenderedDag
+    :param tarball: Path to the tarball file, or a binary stream to write it to (like an object storage upload)
+    :param compression: one of gz, bz2 and xz, or an empty string for an uncompressed tarball
+    :param mtime: modification timestamp of the DAG files, None uses the current time
+
+    :returns: None
+    """
+    mtime = time.time() if mtime is None else mtime
+    if not hasattr(tarball, 'write'):
+        data = io.BytesIO()
+        write_to_tarball(rendered_dags, data, compression, mtime)
+        write_if_changed(tarball, data.getvalue())
+        return
+    with tarfile.open(fileobj=tarball, mode='w|{}'.format(compression)) as archive:
+        for rendered_dag in rendered_dags:
+            content = rendered_dag.source.encode('utf-8')
+            member = tarfile.TarInfo(rendered_dag.file_name)
+            member.size = len(content)
+            member.mtime = mtime
+            member.mode = 0o644
+            archive.addfile(member, io.BytesIO(content))
+
+
+def write_to_zip(rendered_dags, zip_file):
+    """
+    Writes the rendered DAGs (see rendering.render_dags) to a zip file, one DAG Py file each at its root, so it can be
+    dropped as is in the DAGs folder of Airflow (which loads the DAGs of zip files). A zip file is written atomically,
+    see output.write_if_changed.
+
+    :param rendered_dags: iterable of rendering.RenderedDag
+    :param zip_file: Path to the zip file, or a binary stream to write it to
+
+    :returns: None
+    """
+    if not hasattr(zip_file, 'write'):
+        data = io.BytesIO()
+        write_to_zip(rendered_dags, data)
+        write_if_changed(zip_file, data.getvalue())
+        return
+    with zipfile.ZipFile(zip_file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for rendered_dag in rendered_dags:
+            archive.writestr(rendered_dag.file_name, rendered_dag.source)
@@ -0,0 +1,103 @@
+import os
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta
+
+# Number of compiled templates kept in memory by each Jinja2 Environment (least recently used ones are evicted)
+TEMPLATE_CACHE_SIZE = 400
+
+
+def get_template_environment(input_template_path, bytecode_cache_dir=None):
+    """
+    Returns the Jinja2 Environment for the given template folder(s). The Environment is created once per search path
+    and reused for the lifetime of the process, so the templates compiled by it (including the shared templates
+    extended, included or imported by many DAG templates) are shared across all the DAGs generated from that search
+    path. The compiled templates are kept in a least recently used cache of TEMPLATE_CACHE_SIZE templates, and reloaded
+    when their file changes.
+
+    With a bytecode cache folder, the compiled templates are also persisted on disk, so the following runs of the
+    generator load them instead of lexing, parsing and compiling the templates again. A persisted template is
+    recompiled as soon as the checksum of its source changes.
+
+    :param input_template_path: Path to the DAG Jinja2 Template file(s), or a search path of several template folders,
+     see get_template_search_path
+    :param bytecode_cache_dir: Path to the folder to persist the compiled templates in, None disables it
+
+    :returns: jinja2.Environment loading templates from input_template_path
+    """
+    return _get_template_environment(tuple(get_template_search_path(input_template_path)), bytecode_cache_dir)
+
+
+def get_template_search_path(input_template_path):
+    """
+    Returns the template folders of a template search path. A template is looked up in the folders in order, so a DAG
+    template of a team folder can extend, include or import the templates of a shared library folder listed after it.
+
+    :param input_template_path: Path to a template folder, several of them separated by os.pathsep (":" on Linux) or
+     a list of them
+
+    :returns: list of template folder paths
+    """
+    if isinstance(input_template_path, str):
+        return input_template_path.split(os.pathsep)
+    return list(input_template_path)
+
+
+@lru_cache(maxsize=32)
+def _get_template_environment(template_folders, bytecode_cache_dir):
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    return Environment(loader=FileSystemLoader(list(template_folders)), trim_blocks=True, lstrip_blocks=True,
+                       cache_size=TEMPLATE_CACHE_SIZE, bytecode_cache=bytecode_cache)
+
+
+def get_template_sources(env, template_name):
+    """
+    Returns the source of the given template along with the sources of all the templates it includes, extends or
+    imports, directly or transitively. Templates referenced through a dynamic expression (for example
+    {% include some_variable %}) can't be discovered and are ignored.
+
+    :param env: jinja2.Environment to load the templates with
+    :param template_name: Name of the DAG Jinja2 Template file
+
+    :returns: dictionary of template name to template source
+
+    :raises jinja2.exceptions.TemplateNotFound: when the template or one of its references doesn't exist
+    """
+    return {name: source for name, source, _ in _walk_templates(env, template_name)}
+
+
+def get_template_files(env, template_name):
+    """
+    Returns the file of the given template along with the files of all the templates it includes, extends or imports,
+    directly or transitively, see get_template_sources.
+
+    :param env: jinja2.Environment to load the templates with
+    :param template_name: Name of the DAG Jinja2 Template file
+
+    :returns: dictionary of template name to template file path
+
+    :raises jinja2.exceptions.TemplateNotFound: when the template or one of its references doesn't exist
+    """
+    return {name: filename for name, _, filename in _walk_templates(env, template_name)}
+
+
+def _walk_templates(env, template_name):
+    """Yields the name, source and file of the template and of all the templates it references, each one once."""
+    seen = set()
+    pending = [template_name]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        source, filename, _ = env.loader.get_source(env, name)
+        yield name, source, filename
+        pending.extend(_get_referenced_templates(env, source))
+
+
+@lru_cache(maxsize=256)
+def _get_referenced_templates(env, source):
+    return tuple(name for name in meta.find_referenced_templates(env.parse(source)) if name is not None)
@@ -0,0 +1,180 @@
+import ast
+import re
+from operator import itemgetter
+
+TASK_ID_PATTERN = re.compile(r'^[\w.-]+$')
+TASK_ID_MAX_LENGTH = 250
+
+
+def check_dag_file(dag_file):
+    """
+    Statically validates a generated Python DAG file, see check_dag_source.
+
+    :param dag_file: Path to the generated Python DAG file
+
+    :returns: list of error messages, empty when no error was found
+    """
+    with open(dag_file) as source_file:
+        return check_dag_source(source_file.read(), dag_file)
+
+
+def check_dag_source(source, filename='<unknown>'):
+    """
+    Statically validates the source of a generated Python DAG without importing Airflow nor running the DAG code, so
+    that the most common mistakes are caught in milliseconds before the (much more expensive) airflow DagBag import:
+
+    - syntax errors
+    - invalid task_id literals, for example the empty one rendered from a misspelled template variable
+    - task_id literals duplicated within the same DAG
+    - cycles in the task dependencies declared with >>, <<, set_upstream and set_downstream
+
+    Only what can be read from the source is checked (tasks bound to a variable and defined with a literal task_id),
+    everything else is left to the DagBag import.
+
+    :param source: Source code of the generated Python DAG
+    :param filename: Name of the DAG file, used in the error messages
+
+    :returns: list of error messages, empty when no error was found
+    """
+    try:
+        tree = ast.parse(source, filename)
+    except SyntaxError as error:
+        return ['SyntaxError: {} ({}, line {})'.format(error.msg, filename, error.lineno)]
+
+    tasks, downstream = _find_task_graph(_iter_statements(tree.body))
+    errors = _check_task_ids(tasks, filename)
+    cycle = _find_cycle(downstream)
+    if cycle:
+        errors.append('Cycle detected in DAG task dependencies ({}): {}'.format(
+            filename, ' >> '.join(tasks[binding]['task_id'] for binding in cycle)))
+    return errors
+
+
+def _get_string(node):
+    """Returns the value of a string literal node, None when the node isn't a string literal."""
+    if isinstance(node, ast.Constant):
+        return node.value if isinstance(node.value, str) else None
+    return getattr(node, 's', None) if type(node).__name__ == 'Str' else None
+
+
+def _iter_statements(statements, with_dag=None):
+    """
+    Yields every statement, including the ones nested in compound statements, along with the name of the DAG of the
+    innermost enclosing "with DAG(...) as name:" block. Only the statements are visited, not the (many more) expression
+    nodes, which keeps the validation of large DAGs fast.
+    """
+    for statement in statements:
+        yield statement, with_dag
+        nested_with_dag = with_dag
+        if isinstance(statement, ast.With):
+            names = [item.optional_vars.id for item in statement.items if isinstance(item.optional_vars, ast.Name)]
+            nested_with_dag = names[0] if names else with_dag
+        for field in ('body', 'orelse', 'finalbody'):
+            nested_statements = getattr(statement, field, None)
+            if isinstance(nested_statements, list):
+                yield from _iter_statements(nested_statements, nested_with_dag)
+        for handler in getattr(statement, 'handlers', None) or []:
+            yield from _iter_statements(handler.body, nested_with_dag)
+
+
+def _check_task_ids(tasks, filename):
+    errors = []
+    seen_task_ids = {}
+    for task in sorted(tasks.values(), key=lambda task: task['lineno']):
+        task_id = task['task_id']
+        if not TASK_ID_PATTERN.match(task_id) or len(task_id) > TASK_ID_MAX_LENGTH:
+            errors.append('The key ({}) has to be made of alphanumeric characters, dashes, dots and underscores '
+                          'exclusively ({}, line {})'.format(task_id, filename, task['lineno']))
+        elif (task['dag'], task_id) in seen_task_ids:
+            errors.append('Duplicate task_id {} ({}, lines {} and {})'.format(
+                task_id, filename, seen_task_ids[(task['dag'], task_id)], task['lineno']))
+        else:
+            seen_task_ids[(task['dag'], task_id)] = task['lineno']
+    return errors
+
+
+def _find_task_graph(statements):
+    """
+    Returns the tasks defined with a literal task_id and the downstream tasks of every task, both keyed by the binding
+    of the task: the (with_dag, name, lineno) tuple of the variable assignment defining it. A name in a dependency
+    resolves to its latest assignment, so that two DAGs reusing the same variable names don't share their tasks.
+    """
+    tasks = {}
+    # Name of every variable holding a task to its latest binding
+    bindings = {}
+    downstream = {}
+
+    def resolve(node):
+        # Returns the task bindings an expression evaluates to, recording the dependencies it declares
+        if isinstance(node, ast.Name):
+            return [bindings[node.id]] if node.id in bindings else []
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return [binding for element in node.elts for binding in resolve(element)]
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.RShift, ast.LShift)):
+            left, right = resolve(node.left), resolve(node.right)
+            upstream, downstream_bindings = (left, right) if isinstance(node.op, ast.RShift) else (right, left)
+            for binding in upstream:
+                downstream[binding].update(downstream_bindings)
+            return right
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and
+                node.func.attr in ('set_upstream', 'set_downstream') and node.args):
+            task, others = resolve(node.func.value), resolve(node.args[0])
+            upstream, downstream_bindings = (others, task) if node.func.attr == 'set_upstream' else (task, others)
+            for binding in upstream:
+                downstream[binding].update(downstream_bindings)
+        return []
+
+    for node, with_dag in statements:
+        if isinstance(node, ast.Expr):
+            resolve(node.value)
+        elif isinstance(node, ast.Assign):
+            task = _get_task(node, with_dag)
+            names = [target.id for target in node.targets if isinstance(target, ast.Name)]
+            if task is None:
+                # The variables don't hold a task anymore
+                for name in names:
+                    bindings.pop(name, None)
+            elif names:
+                # All the names of a chained assignment are bound to the same task
+                binding = (with_dag, names[0], node.lineno)
+                tasks[binding] = task
+                downstream[binding] = set()
+                bindings.update(dict.fromkeys(names, binding))
+    return tasks, downstream
+
+
+def _get_task(node, with_dag):
+    """Returns the task defined by an assignment with a literal task_id, None when it doesn't define such a task."""
+    if not isinstance(node.value, ast.Call):
+        return None
+    keywords = {keyword.arg: keyword.value for keyword in node.value.keywords}
+    task_id = _get_string(keywords['task_id']) if 'task_id' in keywords else None
+    if task_id is None:
+        return None
+    dag = ast.dump(keywords['dag']) if 'dag' in keywords else with_dag
+    return {'task_id': task_id, 'dag': dag, 'lineno': node.lineno}
+
+
+def _find_cycle(downstream):
+    """Returns the task bindings forming a cycle (first one repeated at the end), None when there is no cycle."""
+    visited = set()
+    # Sorted by name then line, as the DAG of a binding may be None
+    for root in sorted(downstream, key=itemgetter(1, 2)):
+        if root in visited:
+            continue
+        # Iterative depth first search, so that long chains of tasks don't exceed the recursion limit
+        path, on_path = [root], {root}
+        pending = [iter(sorted(downstream[root], key=itemgetter(1, 2)))]
+        while pending:
+            next_binding = next(pending[-1], None)
+            if next_binding is None:
+                visited.add(path[-1])
+                on_path.discard(path.pop())
+                pending.pop()
+            elif next_binding in on_path:
+                return path[path.index(next_binding):] + [next_binding]
+            elif next_binding not in visited:
+                path.append(next_binding)
+                on_path.add(next_binding)
+                pending.append(iter(sorted(downstream[next_binding], key=itemgetter(1, 2))))
+    return None
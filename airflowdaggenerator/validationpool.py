@@ -0,0 +1,261 @@
+import multiprocessing
+import os
+import time
+from collections import deque, namedtuple
+from multiprocessing.connection import wait
+
+from . import instrumentation
+from .validation import check_dag_file
+
+DagImportError = namedtuple('DagImportError', ['file', 'kind', 'message'])
+DagImportError.__doc__ = """
+Import error of a generated DAG file. kind is "static" when the file failed the static validation (see
+validation.check_dag_file), "import" when airflow DagBag reported an import error, "timeout" when the import took more
+than the timeout of the pool, "memory" when it exceeded the memory limit of the pool and "crash" when the worker process
+importing it died.
+"""
+
+
+class ValidationPool(object):
+    """
+    Pool of reusable worker processes validating generated DAG files by importing them into airflow DagBag, so that
+    the DAG code never runs in the generator process. Airflow is imported once by every worker when it starts, the
+    workers starting in the background while the other workers keep importing files. A worker taking more than the
+    timeout to import a file is killed and replaced, so a hanging top level statement of a DAG fails its file instead
+    of blocking the run, and every worker is replaced after importing max_files_per_worker files, so the imported DAG
+    modules don't pile up in memory.
+
+    The pool is a context manager, closing the workers on exit::
+
+        with ValidationPool(workers=4, timeout=30) as validation_pool:
+            import_errors = validation_pool.validate(dag_files)
+
+    :param workers: number of worker processes importing the DAG files in parallel
+    :param timeout: number of seconds a worker may take to import a DAG file, None waits forever
+    :param memory_limit: maximum size in bytes of the address space of every worker (on the platforms supporting
+     resource.RLIMIT_AS), None doesn't limit it. Airflow and its dependencies alone take a few hundred megabytes
+    :param max_files_per_worker: number of DAG files a worker imports before being replaced, None never replaces it
+    :param startup_timeout: number of seconds a worker may take to import Airflow when it starts, None waits forever
+
+    :raises ValueError: when the number of workers or max_files_per_worker is less than 1
+    """
+
+    def __init__(self, workers=1, timeout=60, memory_limit=None, max_files_per_worker=100, startup_timeout=300):
+        if workers < 1:
+            raise ValueError("Invalid number of validation workers. It should be 1 or more")
+        if max_files_per_worker is not None and max_files_per_worker < 1:
+            raise ValueError("Invalid number of files per validation worker. It should be 1 or more")
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_files_per_worker = max_files_per_worker
+        self.startup_timeout = startup_timeout
+        self._idle_workers = []
+
+    def validate(self, dag_files):
+        """
+        Validates the given generated DAG files, each one being imported into its own DagBag by a worker process. The
+        files are first statically validated in the current process, and the files failing it aren't imported. The
+        static_validate and dagbag_import events of every file are emitted to the instrumentation hooks, the import
+        being timed from the file being sent to a worker to its errors (or the timeout, or the crash) being received.
+
+        :param dag_files: list of paths to the generated Python DAG files
+
+        :returns: dictionary of DAG file path to its DagImportError, empty when all the DAG files are valid
+
+        :raises ImportError: when Airflow can't be imported by the workers, or a worker takes more than the startup
+         timeout to import it
+        """
+        import_errors = {}
+        pending_files = deque()
+        for dag_file in dag_files:
+            with instrumentation.measure('static_validate', os.path.basename(dag_file)):
+                static_errors = check_dag_file(dag_file)
+            if static_errors:
+                import_errors[dag_file] = DagImportError(dag_file, 'static', '\n'.join(static_errors))
+            else:
+                pending_files.append(dag_file)
+
+        busy_workers = {}
+        starting_workers = {}
+        try:
+            while pending_files or busy_workers:
+                while pending_files and self._idle_workers:
+                    worker = self._idle_workers.pop()
+                    dag_file = pending_files.popleft()
+                    worker.connection.send(dag_file)
+                    busy_workers[worker.connection] = (worker, dag_file, _get_deadline(self.timeout),
+                                                       _start_import_event(dag_file))
+                # The workers are started in the background, the others keep importing files meanwhile
+                while (len(starting_workers) < len(pending_files) and
+                       len(busy_workers) + len(starting_workers) < self.workers):
+                    worker = _Worker(self.memory_limit)
+                    starting_workers[worker.connection] = (worker, _get_deadline(self.startup_timeout))
+                deadlines = [deadline for _, _, deadline, _ in busy_workers.values() if deadline is not None]
+                deadlines.extend(deadline for _, deadline in starting_workers.values() if deadline is not None)
+                timeout = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+                for connection in wait(list(busy_workers) + list(starting_workers), timeout):
+                    if connection in starting_workers:
+                        worker, _ = starting_workers.pop(connection)
+                        self._check_worker_started(worker)
+                        self._idle_workers.append(worker)
+                        continue
+                    worker, dag_file, _, import_event = busy_workers.pop(connection)
+                    try:
+                        file_errors = connection.recv()
+                    except (EOFError, OSError):
+                        _emit_import_event(import_event)
+                        worker.stop()
+                        import_errors[dag_file] = DagImportError(
+                            dag_file, 'crash', 'The validation worker died (exit code {}) while importing the DAG '
+                                               'file'.format(worker.process.exitcode))
+                        continue
+                    _emit_import_event(import_event)
+                    import_errors.update((error.file, error) for error in file_errors)
+                    if any(error.kind == 'memory' for error in file_errors):
+                        # A worker which ran out of memory may be left in an inconsistent state
+                        worker.stop()
+                    else:
+                        self._release_worker(worker)
+                now = time.monotonic()
+                for worker, deadline in starting_workers.values():
+                    if deadline is not None and deadline <= now:
+                        raise ImportError("The validation workers can't import Airflow: importing it took more than {} "
+                                          "seconds".format(self.startup_timeout))
+                for connection, (worker, dag_file, deadline, import_event) in list(busy_workers.items()):
+                    if deadline is not None and deadline <= now:
+                        del busy_workers[connection]
+                        worker.kill()
+                        _emit_import_event(import_event)
+                        import_errors[dag_file] = DagImportError(
+                            dag_file, 'timeout', 'Importing the DAG file took more than {} seconds'.format(
+                                self.timeout))
+        finally:
+            # Workers interrupted in the middle of an import (or of their start up) can't be reused
+            for worker, _, _, _ in busy_workers.values():
+                worker.kill()
+            for worker, _ in starting_workers.values():
+                worker.kill()
+        return import_errors
+
+    def get_import_errors(self, dag_files):
+        """Same as validate, but returns the import error messages like airflowdaggenerator.get_import_errors."""
+        return {dag_file: '{}: {}'.format(error.kind, error.message)
+                for dag_file, error in self.validate(dag_files).items()}
+
+    def close(self):
+        """Stops all the worker processes."""
+        while self._idle_workers:
+            self._idle_workers.pop().stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _check_worker_started(self, worker):
+        """Receives the start up outcome of a worker, stopping it and raising ImportError when it failed."""
+        try:
+            ready = worker.connection.recv()
+        except EOFError:
+            ready = 'the worker died on start up'
+        if ready is not None:
+            worker.stop()
+            raise ImportError("The validation workers can't import Airflow: {}".format(ready))
+
+    def _release_worker(self, worker):
+        worker.files += 1
+        if self.max_files_per_worker is not None and worker.files >= self.max_files_per_worker:
+            worker.stop()
+        else:
+            self._idle_workers.append(worker)
+
+
+class _Worker(object):
+    """A worker process of a ValidationPool, along with the connection to send it the DAG files to import."""
+
+    def __init__(self, memory_limit):
+        self.connection, worker_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_run_worker, args=(worker_connection, memory_limit), daemon=True)
+        self.process.start()
+        worker_connection.close()
+        self.files = 0
+
+    def stop(self):
+        """Asks the worker process to exit, and kills it when it doesn't."""
+        if self.process.is_alive():
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+            self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        """Kills the worker process, even in the middle of an import."""
+        if self.process.is_alive():
+            # terminate sends SIGTERM, which a DAG could ignore, SIGKILL (Process.kill) is only available from
+            # Python 3.7
+            getattr(self.process, 'kill', self.process.terminate)()
+        self.process.join()
+        self.connection.close()
+
+
+def _get_deadline(timeout):
+    return time.monotonic() + timeout if timeout is not None else None
+
+
+def _start_import_event(dag_file):
+    """Starts timing the import of a DAG file by a worker, returns None when no instrumentation hook is registered."""
+    if not instrumentation.has_hooks():
+        return None
+    return {'stage': 'dagbag_import', 'dag': os.path.basename(dag_file), 'start': time.time()}, time.perf_counter()
+
+
+def _emit_import_event(import_event):
+    """Emits the dagbag_import event started by _start_import_event, once the import of the DAG file is over."""
+    if import_event is not None:
+        event, start = import_event
+        event['seconds'] = time.perf_counter() - start
+        instrumentation.emit(event)
+
+
+def _run_worker(connection, memory_limit):
+    """Imports Airflow, then imports every DAG file received from the connection into its own DagBag."""
+    if memory_limit is not None:
+        _limit_memory(memory_limit)
+    try:
+        from airflow.models import DagBag
+    except Exception as exception:
+        connection.send('{}: {}'.format(type(exception).__name__, exception))
+        return
+    connection.send(None)
+    while True:
+        try:
+            dag_file = connection.recv()
+        except EOFError:
+            return
+        if dag_file is None:
+            return
+        try:
+            file_errors = [DagImportError(file, 'import', message) for file, message in
+                           DagBag(dag_folder=dag_file, include_examples=False).import_errors.items()]
+        except MemoryError:
+            file_errors = [DagImportError(dag_file, 'memory', 'Importing the DAG file exceeded the memory limit of '
+                                                              '{} bytes'.format(memory_limit))]
+        except Exception as exception:
+            file_errors = [DagImportError(dag_file, 'import', '{}: {}'.format(type(exception).__name__, exception))]
+        connection.send(file_errors)
+
+
+def _limit_memory(memory_limit):
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    except (ValueError, OSError):
+        pass
@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+
+from .airflowdaggenerator import GenerationResult, generate_dags
+from .dependencyindex import get_job_dependencies, get_output_dag_file
+from .templates import get_template_search_path
+
+
+def watch(load_jobs, report, validate=True, interval=1.0, bytecode_cache_dir=None, use_polling=False,
+          max_changes=None, validation_pool=None):
+    """
+    Generates (and validates) the DAGs of the given jobs, then stays resident and regenerates only the DAGs depending on
+    a configuration file or a template (including the included, extended and imported ones) every time one of them
+    changes. The Jinja2 Environments, the compiled templates, the loaded configurations and Airflow stay loaded in
+    memory between the changes, so each change only costs the re-rendering (and validation) of the affected DAGs.
+
+    The configuration and template folders are watched with inotify (or the native equivalent of the platform) when the
+    optional watchdog package is installed, and polled every interval seconds otherwise.
+
+    A file saved half edited doesn't stop the watch: a DAG whose template can't be parsed fails (and is regenerated on
+    every following change until it succeeds), and when the jobs can't be loaded again after a change (for example
+    because of an invalid manifest or config stream) the failure is reported and the previous jobs are kept.
+
+    :param load_jobs: callable returning the batch generation jobs (see generate_dags). It is called again after every
+     change, so that added configuration files and changed configurations of a config stream are picked up
+    :param report: callable receiving the list of GenerationResult of every (re)generation. When the jobs can't be
+     loaded again, it receives a single GenerationResult holding the error, without config_file nor output_dag_file
+    :param validate: whether to validate each generated DAG file by leveraging airflow DagBag
+    :param interval: number of seconds between two checks for changes
+    :param bytecode_cache_dir: Path to the folder to persist the compiled Jinja2 templates in, None disables it
+    :param use_polling: whether to poll the folders even when watchdog is installed
+    :param max_changes: number of changes to handle before returning, None watches forever
+    :param validation_pool: validationpool.ValidationPool importing the DAG files in isolated worker processes, so the
+     imported DAG modules don't pile up in the watching process. None imports them in the current process
+
+    :returns: None
+    """
+    jobs = _get_jobs_by_output_file(load_jobs())
+    dependencies = {}
+    _update_dependencies(dependencies, jobs.values(), bytecode_cache_dir)
+    report(generate_dags(jobs.values(), validate=validate, bytecode_cache_dir=bytecode_cache_dir,
+                         validation_pool=validation_pool))
+
+    def get_directories():
+        directories = {os.path.dirname(path) for paths in dependencies.values() for path in paths}
+        directories.update(os.path.abspath(template_folder) for job in jobs.values()
+                           for template_folder in get_template_search_path(job['input_template_path']))
+        return {directory for directory in directories if os.path.isdir(directory)}
+
+    iter_changes = _iter_polled_changes if use_polling or not _has_watchdog() else _iter_watchdog_changes
+    changes = iter_changes(get_directories, interval)
+    try:
+        for handled_changes, changed_paths in enumerate(changes, 1):
+            previous_jobs = jobs
+            try:
+                jobs = _get_jobs_by_output_file(load_jobs())
+            except Exception as exception:
+                report([GenerationResult(None, None, 'Loading the jobs failed, the previous jobs are kept. {}: {}'
+                                         .format(type(exception).__name__, exception), False, False)])
+            # The DAGs whose dependencies are unknown are regenerated on any change, until their templates are valid
+            affected_jobs = [job for output_dag_file, job in jobs.items()
+                             if job != previous_jobs.get(output_dag_file) or output_dag_file not in dependencies or
+                             dependencies[output_dag_file] & changed_paths]
+            dependencies = {output_dag_file: dependencies[output_dag_file] for output_dag_file in jobs
+                            if output_dag_file in dependencies}
+            _update_dependencies(dependencies, affected_jobs, bytecode_cache_dir)
+            if affected_jobs:
+                report(generate_dags(affected_jobs, validate=validate, bytecode_cache_dir=bytecode_cache_dir,
+                                     validation_pool=validation_pool))
+            if max_changes is not None and handled_changes >= max_changes:
+                return
+    finally:
+        changes.close()
+
+
+def _update_dependencies(dependencies, jobs, bytecode_cache_dir):
+    """
+    Records the dependencies of the jobs, see get_job_dependencies. The dependencies of a job whose templates can't be
+    parsed are dropped, the job failing its generation anyway.
+    """
+    for job in jobs:
+        output_dag_file = get_output_dag_file(job)
+        try:
+            dependencies[output_dag_file] = get_job_dependencies(job, bytecode_cache_dir)
+        except Exception:
+            dependencies.pop(output_dag_file, None)
+
+
+def _get_jobs_by_output_file(jobs):
+    return {get_output_dag_file(job): job for job in jobs}
+
+
+def _has_watchdog():
+    try:
+        import watchdog  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _snapshot(directories):
+    """Returns the modification time and size of every file of the given folders, keyed by file path."""
+    snapshot = {}
+    for directory in directories:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[os.path.abspath(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+    return snapshot
+
+
+def _iter_polled_changes(get_directories, interval):
+    """Yields the set of files added, changed or removed in the watched folders, by polling them."""
+    snapshot = _snapshot(get_directories())
+    while True:
+        time.sleep(interval)
+        new_snapshot = _snapshot(get_directories())
+        changed_paths = {path for path in set(snapshot) | set(new_snapshot)
+                         if snapshot.get(path) != new_snapshot.get(path)}
+        snapshot = new_snapshot
+        if changed_paths:
+            yield changed_paths
+
+
+def _iter_watchdog_changes(get_directories, interval):
+    """Yields the set of files added, changed or removed in the watched folders, as notified by watchdog."""
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    changed_paths = set()
+    lock = threading.Lock()
+
+    class ChangeHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            with lock:
+                changed_paths.add(os.path.abspath(event.src_path))
+                if getattr(event, 'dest_path', None):
+                    changed_paths.add(os.path.abspath(event.dest_path))
+
+    handler = ChangeHandler()
+    observer = Observer()
+    watched_directories = set()
+    observer.start()
+    try:
+        while True:
+            for directory in get_directories() - watched_directories:
+                observer.schedule(handler, directory, recursive=False)
+                watched_directories.add(directory)
+            time.sleep(interval)
+            with lock:
+                batch = set(changed_paths)
+                changed_paths.clear()
+            if batch:
+                yield batch
+    finally:
+        observer.stop()
+        observer.join()
@@ -0,0 +1,56 @@
+"""
+Measures the start up time of the Airflow DAG Generator command line tool and prints the results as JSON.
+
+Run from the project root directory::
+
+    python benchmarks/bench_startup.py --repeat 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_DIR, "tests", "data")
+
+
+def measure(command, repeat):
+    """Runs the command repeat times and returns its wall clock durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Airflow DAG Generator start up time benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs of every scenario (default: 5)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dag_path:
+        scenarios = {
+            "python": [sys.executable, "-c", "pass"],
+            "help": [sys.executable, "-m", "airflowdaggenerator", "-h"],
+            "generate_no_validate": [sys.executable, "-m", "airflowdaggenerator",
+                                     "-config_yml_path", DATA_DIR, "-config_yml_file_name", "dag_properties.yml",
+                                     "-template_path", DATA_DIR, "-template_file_name", "sample_dag_template.py.j2",
+                                     "-dag_path", output_dag_path, "-dag_file_name", "test_dag.py", "--no-validate"],
+        }
+        results = {}
+        for name, command in scenarios.items():
+            durations = measure(command, args.repeat)
+            results[name] = {"min": min(durations), "median": statistics.median(durations), "max": max(durations)}
+
+    json.dump({"benchmark": "startup", "python": sys.version.split()[0], "repeat": args.repeat,
+               "results_seconds": results}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
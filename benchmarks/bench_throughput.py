@@ -0,0 +1,165 @@
+"""
+Measures the throughput of the Airflow DAG Generator stages (YAML configuration load, template rendering, DAG file
+write, static validation and airflow DagBag validation) for a growing number of synthesized DAGs and templates of
+growing size, and prints the results as JSON so they can be compared across versions.
+
+Run from the project root directory::
+
+    python benchmarks/bench_throughput.py --dags 1 100 10000 --output bench_output.json
+
+The configurations are synthesized from tests/data/dag_properties.yml and the templates from
+tests/data/sample_dag_template.py.j2, the large templates having additional chained tasks. The DagBag validation is
+only measured when Airflow is installed, on at most --validate-limit DAGs, so it is reported with its own number of
+DAGs and throughput and left out of the overall dags_per_second.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_DIR, "tests", "data")
+sys.path.insert(0, PROJECT_DIR)
+
+from airflowdaggenerator import __version__, airflowdaggenerator  # noqa: E402
+from airflowdaggenerator.configs import load_config  # noqa: E402
+from airflowdaggenerator.output import write_if_changed  # noqa: E402
+from airflowdaggenerator.templates import get_template_environment  # noqa: E402
+from airflowdaggenerator.validation import check_dag_file  # noqa: E402
+
+TEMPLATE_EXTRA_TASKS = {"small": 0, "medium": 50, "large": 500}
+
+EXTRA_TASK = """
+extra_task_{index} = BashOperator(
+    task_id='{{{{bash_task_id}}}}_{index}',
+    bash_command='echo {index}',
+    dag=dag,
+)
+{upstream} >> extra_task_{index}
+"""
+
+
+def synthesize_template(template_dir, size):
+    """Writes a template with TEMPLATE_EXTRA_TASKS[size] more tasks than the sample template, returns its name."""
+    with open(os.path.join(DATA_DIR, "sample_dag_template.py.j2")) as sample_template:
+        source, main_block = sample_template.read().split('\n\nif __name__ == "__main__":')
+    for index in range(TEMPLATE_EXTRA_TASKS[size]):
+        upstream = "bash_task" if index == 0 else "extra_task_{}".format(index - 1)
+        source += EXTRA_TASK.format(index=index, upstream=upstream)
+    template_name = "{}_dag_template.py.j2".format(size)
+    with open(os.path.join(template_dir, template_name), "w") as template:
+        template.write(source + '\n\nif __name__ == "__main__":' + main_block)
+    return template_name
+
+
+def synthesize_configs(config_dir, dags):
+    """Writes dags configuration files derived from the sample configuration, returns their paths."""
+    with open(os.path.join(DATA_DIR, "dag_properties.yml")) as sample_config:
+        # The trailing empty email of the sample configuration isn't a valid email address
+        source = sample_config.read().replace("  -\n", "")
+    config_files = []
+    for index in range(dags):
+        config_file = os.path.join(config_dir, "dag_{}.yml".format(index))
+        with open(config_file, "w") as config:
+            config.write(source.replace("calculation_ingestion_job", "calculation_ingestion_job_{}".format(index)))
+        config_files.append(config_file)
+    return config_files
+
+
+def run_stages(config_files, template_dir, template_name, output_dir, validate_limit, trace_memory):
+    """Runs every stage over all the DAGs, returns the duration (and peak memory) of each stage."""
+    stages = {}
+
+    def measure(stage, function, *args):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = function(*args)
+        stages[stage] = {"seconds": time.perf_counter() - start}
+        if trace_memory:
+            stages[stage]["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return result
+
+    output_files = [os.path.join(output_dir, os.path.splitext(os.path.basename(config_file))[0] + ".py")
+                    for config_file in config_files]
+    configs = measure("yaml_load", lambda: [load_config(config_file) for config_file in config_files])
+    # A fresh template folder gets a new Environment, so the template is really compiled
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(template_dir)) as fresh_template_dir:
+        shutil.copy(os.path.join(template_dir, template_name), fresh_template_dir)
+        template = measure("template_compile",
+                           lambda: get_template_environment(fresh_template_dir).get_template(template_name))
+    sources = measure("render", lambda: [template.render(config) for config in configs])
+    measure("write", lambda: [write_if_changed(output_file, source)
+                              for output_file, source in zip(output_files, sources)])
+    measure("static_validate", lambda: [check_dag_file(output_file) for output_file in output_files])
+    if _has_airflow() and validate_limit:
+        validated_files = output_files[:validate_limit]
+        measure("validate_dag", airflowdaggenerator.validate_dag, validated_files)
+        stages["validate_dag"]["dags"] = len(validated_files)
+        stages["validate_dag"]["dags_per_second"] = len(validated_files) / stages["validate_dag"]["seconds"]
+    for output_file in output_files:
+        os.remove(output_file)
+    return stages
+
+
+def _has_airflow():
+    try:
+        import airflow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Airflow DAG Generator throughput benchmark")
+    parser.add_argument("--dags", type=int, nargs="+", default=[1, 100, 10000],
+                        help="Numbers of DAGs to generate (default: 1 100 10000)")
+    parser.add_argument("--templates", nargs="+", choices=sorted(TEMPLATE_EXTRA_TASKS), default=["small", "large"],
+                        help="Sizes of the templates to render (default: small large)")
+    parser.add_argument("--validate-limit", type=int, default=100,
+                        help="Maximum number of DAGs validated with airflow DagBag (default: 100)")
+    parser.add_argument("--output", help="Path to write the JSON results to (default: standard output)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        template_dir, config_dir, output_dir = (os.path.join(work_dir, name)
+                                                for name in ("templates", "configs", "dags"))
+        for directory in (template_dir, config_dir, output_dir):
+            os.mkdir(directory)
+        template_names = {size: synthesize_template(template_dir, size) for size in args.templates}
+        for dags in args.dags:
+            config_files = synthesize_configs(config_dir, dags)
+            for size, template_name in template_names.items():
+                # Timings are measured without tracemalloc, which slows down the allocations, then memory with it
+                stages = run_stages(config_files, template_dir, template_name, output_dir, args.validate_limit, False)
+                memory_stages = run_stages(config_files, template_dir, template_name, output_dir,
+                                           args.validate_limit, True)
+                for stage, measures in memory_stages.items():
+                    stages[stage]["peak_memory_bytes"] = measures["peak_memory_bytes"]
+                # The DagBag validation runs on fewer DAGs, it has its own dags_per_second
+                generation_seconds = sum(measures["seconds"] for stage, measures in stages.items()
+                                         if stage != "validate_dag")
+                results.append({"dags": dags, "template": size, "template_extra_tasks": TEMPLATE_EXTRA_TASKS[size],
+                                "dags_per_second": dags / generation_seconds, "stages": stages})
+            for config_file in config_files:
+                os.remove(config_file)
+
+    report = {"benchmark": "throughput", "version": __version__, "python": platform.python_version(),
+              "platform": platform.platform(), "airflow_validation": _has_airflow(), "results": results}
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
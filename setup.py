@@ -1,8 +1,14 @@
+import re
+
 from setuptools import setup
 
 with open('README.rst') as readme_file:
     readme = readme_file.read()
 
+# Read from the package without importing it, as its dependencies may not be installed yet
+with open('airflowdaggenerator/__init__.py') as init_file:
+    version = re.search(r"^__version__ = '([^']+)'$", init_file.read(), re.MULTILINE).group(1)
+
 # with open('HISTORY.md') as history_file:
 #     history = history_file.read().replace('.. :changelog:', '')
 
@@ -16,7 +22,7 @@ test_requirements = [
 
 setup(
     name='airflowdaggenerator',
-    version='0.0.2',
+    version=version,
     description="Dynamically generates and validates Python Airflow DAG file based on a Jinja2 Template and a YAML "
                 "configuration file to encourage code re-usability",
     long_description=readme,
@@ -29,6 +35,9 @@ setup(
         "console_scripts": ['airflowdaggenerator = airflowdaggenerator.airflowdaggenerator:main']
     },
     install_requires=requirements,
+    extras_require={
+        'watch': ['watchdog'],
+    },
     license="Apache-2.0 License",
     zip_safe=False,
     keywords='airflow, dynamic, dag, generator, jinja2',
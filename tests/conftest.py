@@ -4,6 +4,13 @@ import shutil
 import pytest
 
 
+def write_file(path, content):
+    """writes the content to the file at the given path, returns the path"""
+    with open(path, "w") as output_file:
+        output_file.write(content)
+    return path
+
+
 @pytest.fixture
 def input_config_yaml_path():
     """returns path to the DAG configuration input YAML file"""
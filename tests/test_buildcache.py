@@ -0,0 +1,113 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from mock import patch
+
+from airflowdaggenerator import airflowdaggenerator, buildcache
+from airflowdaggenerator.templates import get_template_environment
+
+from .conftest import write_file
+
+
+def test_compute_build_key_changes_when_an_included_template_changes(output_dag_path):
+    write_file(output_dag_path + os.path.sep + "dag.py.j2", "{% include 'common.py.j2' %}\ndag_id = '{{ dag_id }}'\n")
+    write_file(output_dag_path + os.path.sep + "common.py.j2", "from airflow import DAG\n")
+    env = get_template_environment(output_dag_path)
+
+    first_key = buildcache.compute_build_key(b"dag_id: test\n", env, "dag.py.j2")
+    assert buildcache.compute_build_key(b"dag_id: test\n", env, "dag.py.j2") == first_key
+    assert buildcache.compute_build_key(b"dag_id: other\n", env, "dag.py.j2") != first_key
+
+    write_file(output_dag_path + os.path.sep + "common.py.j2", "from airflow.models import DAG\n")
+    assert buildcache.compute_build_key(b"dag_id: test\n", env, "dag.py.j2") != first_key
+
+
+def test_load_build_cache_returns_empty_cache_when_file_is_missing_or_corrupt(output_dag_path):
+    cache_file = output_dag_path + os.path.sep + "build_cache.json"
+    assert buildcache.load_build_cache(cache_file) == {}
+
+    write_file(cache_file, "{not json")
+    assert buildcache.load_build_cache(cache_file) == {}
+
+    buildcache.save_build_cache(cache_file, {"dag.py": "key"})
+    assert buildcache.load_build_cache(cache_file) == {"dag.py": "key"}
+
+
+def test_generate_dags_skips_up_to_date_dags_with_build_cache(input_config_yaml_path, input_config_yaml_file_name,
+                                                              input_template_path, input_template_file_name,
+                                                              output_dag_path):
+    shutil.copy(input_config_yaml_path + os.path.sep + input_config_yaml_file_name, output_dag_path)
+    cache_file = output_dag_path + os.path.sep + "build_cache.json"
+    job = dict(input_config_yaml_path=output_dag_path, input_config_yaml_file_name=input_config_yaml_file_name,
+               input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+               output_dag_path=output_dag_path, output_dag_file_name="test_dag.py")
+    output_dag_file = output_dag_path + os.path.sep + "test_dag.py"
+
+    first_run, = airflowdaggenerator.generate_dags([job], validate=False, build_cache_file=cache_file)
+    os.utime(output_dag_file, (0, 0))
+    second_run, = airflowdaggenerator.generate_dags([job], validate=False, build_cache_file=cache_file)
+
+    assert not first_run.skipped and second_run.skipped
+    assert os.path.getmtime(output_dag_file) == 0
+
+    with open(output_dag_path + os.path.sep + input_config_yaml_file_name, "a") as config:
+        config.write("message: 'Changed'\n")
+    third_run, = airflowdaggenerator.generate_dags([job], validate=False, build_cache_file=cache_file)
+
+    assert not third_run.skipped
+    assert os.path.getmtime(output_dag_file) != 0
+
+
+def test_generate_dags_validates_up_to_date_dags_generated_without_validation(input_config_yaml_path,
+                                                                             input_config_yaml_file_name,
+                                                                             input_template_path,
+                                                                             input_template_file_name,
+                                                                             output_dag_path):
+    cache_file = output_dag_path + os.path.sep + "build_cache.json"
+    job = dict(input_config_yaml_path=input_config_yaml_path, input_config_yaml_file_name=input_config_yaml_file_name,
+               input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+               output_dag_path=output_dag_path, output_dag_file_name="test_dag.py")
+    airflowdaggenerator.generate_dags([job], validate=False, build_cache_file=cache_file)
+
+    with patch.object(airflowdaggenerator, "get_import_errors", return_value={"test_dag.py": "broken"}) as validate:
+        invalid_run, = airflowdaggenerator.generate_dags([job], build_cache_file=cache_file)
+    assert validate.call_count == 1
+    assert not invalid_run.skipped and invalid_run.error
+
+    with patch.object(airflowdaggenerator, "get_import_errors", return_value={}):
+        airflowdaggenerator.generate_dags([job], build_cache_file=cache_file)
+    unvalidated_run, = airflowdaggenerator.generate_dags([job], validate=False, build_cache_file=cache_file)
+    with patch.object(airflowdaggenerator, "get_import_errors") as validate:
+        validated_run, = airflowdaggenerator.generate_dags([job], build_cache_file=cache_file)
+
+    # Skipping a validated DAG without validating it keeps it validated
+    assert unvalidated_run.skipped and validated_run.skipped
+    validate.assert_not_called()
+
+
+def test_generate_dags_with_workers_sends_every_job_its_own_build_cache_entry_only(input_config_yaml_path,
+                                                                                   input_config_yaml_file_name,
+                                                                                   input_template_path,
+                                                                                   input_template_file_name,
+                                                                                   output_dag_path):
+    cache_file = output_dag_path + os.path.sep + "build_cache.json"
+    jobs = [dict(input_config_yaml_path=input_config_yaml_path, input_config_yaml_file_name=input_config_yaml_file_name,
+                 input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+                 output_dag_path=output_dag_path, output_dag_file_name="dag_{}.py".format(index))
+            for index in range(4)]
+    airflowdaggenerator.generate_dags(jobs[:3], validate=False, build_cache_file=cache_file)
+    run_job = airflowdaggenerator._run_job
+    sent_build_caches = []
+
+    def record_build_cache(job, build_cache=None, **kwargs):
+        sent_build_caches.append(build_cache)
+        return run_job(job, build_cache=build_cache, **kwargs)
+
+    with patch.object(airflowdaggenerator, "ProcessPoolExecutor", ThreadPoolExecutor), \
+            patch.object(airflowdaggenerator, "_run_job", record_build_cache):
+        results = airflowdaggenerator.generate_dags(jobs, validate=False, workers=2, build_cache_file=cache_file)
+
+    assert [result.skipped for result in results] == [True, True, True, False]
+    assert sorted(list(build_cache) for build_cache in sent_build_caches) == [[]] + [
+        [os.path.abspath(output_dag_path + os.path.sep + "dag_{}.py".format(index))] for index in range(3)]
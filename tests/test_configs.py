@@ -0,0 +1,121 @@
+import os
+import types
+
+import pytest
+
+from airflowdaggenerator import airflowdaggenerator, configs
+
+from .conftest import write_file
+
+
+def test_iter_configs_lazily_yields_each_document_of_a_yaml_stream(output_dag_path):
+    config_file = write_file(output_dag_path + os.path.sep + "dags.yml",
+                             "---\ndag_id: first\n---\n---\ndag_id: second\n")
+
+    config_iterator = configs.iter_configs(config_file)
+
+    assert isinstance(config_iterator, types.GeneratorType)
+    assert list(config_iterator) == [{"dag_id": "first"}, {"dag_id": "second"}]
+
+
+def test_iter_configs_yields_each_line_of_a_json_lines_file(output_dag_path):
+    config_file = write_file(output_dag_path + os.path.sep + "dags.jsonl",
+                             '{"dag_id": "first"}\n\n{"dag_id": "second"}\n')
+
+    assert list(configs.iter_configs(config_file)) == [{"dag_id": "first"}, {"dag_id": "second"}]
+
+
+def test_load_config_throws_exception_when_file_has_more_than_one_dag_configuration(output_dag_path):
+    config_file = write_file(output_dag_path + os.path.sep + "dags.yml", "dag_id: first\n---\ndag_id: second\n")
+
+    with pytest.raises(ValueError):
+        configs.load_config(config_file)
+
+
+def test_load_config_rejects_arbitrary_python_objects(output_dag_path):
+    config_file = write_file(output_dag_path + os.path.sep + "dag.yml", "dag_id: !!python/name:os.system\n")
+
+    with pytest.raises(Exception):
+        configs.load_config(config_file)
+
+
+def test_generate_dags_generates_a_dag_per_document_of_a_config_stream(input_config_yaml_path,
+                                                                       input_config_yaml_file_name,
+                                                                       input_template_path, input_template_file_name,
+                                                                       output_dag_path):
+    with open(input_config_yaml_path + os.path.sep + input_config_yaml_file_name) as config:
+        document = config.read().replace("---\n", "")
+    config_file = write_file(output_dag_path + os.path.sep + "dags.yml", "---\n".join(
+        [document.replace("calculation_ingestion_job", "first_job"), document.replace("calculation_ingestion_job", ""),
+         "- not a mapping\n"]))
+
+    jobs = airflowdaggenerator.jobs_from_config_stream(config_file, input_template_path, input_template_file_name,
+                                                       output_dag_path)
+    results = airflowdaggenerator.generate_dags(jobs, validate=False)
+
+    assert [(result.config_file, os.path.basename(result.output_dag_file)) for result in results] == [
+        (config_file + "#0", "first_job.py"), (config_file + "#1", "dags_1.py"), (config_file + "#2", "dags_2.py")]
+    assert [result.error is None for result in results] == [True, True, False]
+    with open(output_dag_path + os.path.sep + "first_job.py") as dag_file:
+        assert "dag_id='first_job'" in dag_file.read()
+
+
+def test_generate_dags_fails_the_dags_of_a_config_stream_with_a_duplicated_dag_id(input_config_yaml_path,
+                                                                                   input_config_yaml_file_name,
+                                                                                   input_template_path,
+                                                                                   input_template_file_name,
+                                                                                   output_dag_path):
+    with open(input_config_yaml_path + os.path.sep + input_config_yaml_file_name) as config:
+        document = config.read().replace("---\n", "")
+    config_file = write_file(output_dag_path + os.path.sep + "dags.yml", "---\n".join(
+        [document.replace("calculation_ingestion_job", "same"), document.replace("Hello World", "Overwritten")
+         .replace("calculation_ingestion_job", "same")]))
+
+    jobs = airflowdaggenerator.jobs_from_config_stream(config_file, input_template_path, input_template_file_name,
+                                                       output_dag_path)
+    results = airflowdaggenerator.generate_dags(jobs, validate=False, workers=2)
+
+    assert results[0].error is None
+    assert "Duplicated DAG file name same.py" in results[1].error
+    with open(output_dag_path + os.path.sep + "same.py") as dag_file:
+        assert "Overwritten" not in dag_file.read()
+
+
+def test_merge_configs_deep_merges_mappings_and_replaces_other_values():
+    base_config = {"default_args": {"owner": "data", "retries": 1}, "email_list": ["team@example.com"]}
+
+    merged_config = configs.merge_configs(base_config, {"default_args": {"retries": 3}, "email_list": []})
+
+    assert merged_config == {"default_args": {"owner": "data", "retries": 3}, "email_list": []}
+    assert base_config["default_args"] == {"owner": "data", "retries": 1}
+
+
+def test_load_config_layers_memoizes_layers_until_they_change(output_dag_path):
+    global_layer = write_file(output_dag_path + os.path.sep + "global.yml", "owner: platform\nretries: 1\n")
+    team_layer = write_file(output_dag_path + os.path.sep + "team.yml", "owner: data\n")
+
+    merged_config = configs.load_config_layers([global_layer, team_layer])
+
+    assert merged_config == {"owner": "data", "retries": 1}
+    assert configs.load_config_layers([global_layer, team_layer]) is merged_config
+    write_file(global_layer, "owner: platform\nretries: 2\n")
+    os.utime(global_layer, ns=(0, 0))
+    assert configs.load_config_layers([global_layer, team_layer]) == {"owner": "data", "retries": 2}
+
+
+def test_generate_dag_merges_the_dag_configuration_over_the_config_layers(input_config_yaml_path,
+                                                                          input_config_yaml_file_name,
+                                                                          input_template_path,
+                                                                          input_template_file_name,
+                                                                          output_dag_path, output_dag_file_name):
+    write_file(output_dag_path + os.path.sep + "dag.yml", "dag_id: layered_job\nmessage: 'Hello Layers'\n")
+
+    airflowdaggenerator.generate_dag(output_dag_path, "dag.yml", input_template_path, input_template_file_name,
+                                     output_dag_path, output_dag_file_name,
+                                     config_layers=[input_config_yaml_path + os.path.sep + input_config_yaml_file_name])
+
+    with open(output_dag_path + os.path.sep + output_dag_file_name) as dag_file:
+        dag_source = dag_file.read()
+    assert "dag_id='layered_job'" in dag_source
+    assert "print('Hello Layers')" in dag_source
+    assert "task_id='echo_task'" in dag_source
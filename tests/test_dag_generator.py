@@ -1,5 +1,7 @@
 import os
+import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import jinja2
 import pytest
@@ -190,3 +192,255 @@ def test_main_generates_output_dag_file_when_required_input_arguments_are_provid
     output_dag_file = output_dag_path + os.path.sep + output_dag_file_name
 
     assert os.path.exists(output_dag_file) and os.path.isfile(output_dag_file)
+
+
+def test_generate_dags_reports_each_failure_without_stopping_the_batch(input_config_yaml_path,
+                                                                       input_config_yaml_file_name,
+                                                                       input_template_path, input_template_file_name,
+                                                                       output_dag_path):
+    valid_job = dict(input_config_yaml_path=input_config_yaml_path,
+                     input_config_yaml_file_name=input_config_yaml_file_name,
+                     input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+                     output_dag_path=output_dag_path, output_dag_file_name="first_dag.py")
+    invalid_job = dict(valid_job, input_config_yaml_file_name="test.txt", output_dag_file_name="second_dag.py")
+    last_job = dict(valid_job, output_dag_file_name="third_dag.py")
+
+    results = airflowdaggenerator.generate_dags([valid_job, invalid_job, last_job], validate=False)
+
+    assert [result.error is None for result in results] == [True, False, True]
+    assert "Invalid input configuration YML file" in results[1].error
+    assert os.path.isfile(output_dag_path + os.path.sep + "third_dag.py")
+
+
+def test_jobs_from_config_directory_names_dag_files_after_config_files(input_config_yaml_path, input_template_path,
+                                                                       input_template_file_name, output_dag_path):
+    jobs = airflowdaggenerator.jobs_from_config_directory(input_config_yaml_path, input_template_path,
+                                                          input_template_file_name, output_dag_path)
+
+    assert [(job['input_config_yaml_file_name'], job['output_dag_file_name']) for job in jobs] == [
+        ("dag_properties.yml", "dag_properties.py")]
+
+
+def test_load_manifest_applies_defaults_and_resolves_paths(input_template_file_name, output_dag_path):
+    manifest_file = output_dag_path + os.path.sep + "manifest.yml"
+    with open(manifest_file, "w") as manifest:
+        manifest.write("defaults:\n"
+                       "  input_config_yaml_path: ../data\n"
+                       "  input_template_path: ../data\n"
+                       "  input_template_file_name: {}\n"
+                       "  output_dag_path: .\n"
+                       "jobs:\n"
+                       "  - input_config_yaml_file_name: dag_properties.yml\n"
+                       "    output_dag_file_name: test_dag.py\n".format(input_template_file_name))
+
+    jobs = airflowdaggenerator.load_manifest(manifest_file)
+
+    assert len(jobs) == 1
+    assert jobs[0]['output_dag_path'] == os.path.join(output_dag_path, ".")
+    assert jobs[0]['input_template_file_name'] == input_template_file_name
+
+
+def test_load_manifest_resolves_template_search_path_and_config_layers(input_template_file_name, output_dag_path):
+    manifest_file = output_dag_path + os.path.sep + "manifest.yml"
+    with open(manifest_file, "w") as manifest:
+        manifest.write("jobs:\n"
+                       "  - input_config_yaml_path: ../data\n"
+                       "    input_config_yaml_file_name: dag_properties.yml\n"
+                       "    input_template_path: [templates, ../data]\n"
+                       "    input_template_file_name: {}\n"
+                       "    output_dag_path: .\n"
+                       "    output_dag_file_name: test_dag.py\n"
+                       "    config_layers: [layers/global.yml]\n".format(input_template_file_name))
+
+    jobs = airflowdaggenerator.load_manifest(manifest_file)
+
+    assert jobs[0]['input_template_path'] == [os.path.join(output_dag_path, "templates"),
+                                              os.path.join(output_dag_path, "../data")]
+    assert jobs[0]['config_layers'] == [os.path.join(output_dag_path, "layers/global.yml")]
+
+
+def test_load_manifest_throws_exception_when_job_is_missing_arguments(output_dag_path):
+    manifest_file = output_dag_path + os.path.sep + "manifest.yml"
+    with open(manifest_file, "w") as manifest:
+        manifest.write("jobs:\n  - input_config_yaml_file_name: dag_properties.yml\n")
+
+    with pytest.raises(ValueError):
+        airflowdaggenerator.load_manifest(manifest_file)
+
+
+def test_main_batch_generates_all_dags_of_the_config_directory(input_config_yaml_path, input_template_path,
+                                                               input_template_file_name, output_dag_path):
+    with patch.object(sys, 'argv', ["prog", "batch",
+                                    "-config_yml_dir", input_config_yaml_path,
+                                    "-template_path", input_template_path,
+                                    "-template_file_name", input_template_file_name,
+                                    "-dag_path", output_dag_path, "--no_validate"]):
+        airflowdaggenerator.main()
+
+    assert os.path.isfile(output_dag_path + os.path.sep + "dag_properties.py")
+
+
+def test_generate_dags_with_workers_returns_results_in_job_order(input_config_yaml_path, input_config_yaml_file_name,
+                                                                 input_template_path, input_template_file_name,
+                                                                 output_dag_path):
+    jobs = [dict(input_config_yaml_path=input_config_yaml_path,
+                 input_config_yaml_file_name="test.txt" if index % 3 == 0 else input_config_yaml_file_name,
+                 input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+                 output_dag_path=output_dag_path, output_dag_file_name="dag_{}.py".format(index))
+            for index in range(10)]
+
+    results = airflowdaggenerator.generate_dags(jobs, validate=False, workers=2)
+
+    assert [result.output_dag_file for result in results] == [
+        output_dag_path + os.path.sep + job['output_dag_file_name'] for job in jobs]
+    assert [result.error is not None for result in results] == [index % 3 == 0 for index in range(10)]
+
+
+def test_generate_dags_with_workers_queues_the_jobs_lazily(input_config_yaml_path, input_template_path,
+                                                           input_template_file_name, output_dag_path):
+    pulled_jobs = []
+
+    def iter_jobs():
+        for index in range(300):
+            pulled_jobs.append(index)
+            yield dict(input_config_yaml_path=input_config_yaml_path, input_config_yaml_file_name="test.txt",
+                       input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+                       output_dag_path=output_dag_path, output_dag_file_name="dag_{}.py".format(index))
+
+    run_job = airflowdaggenerator._run_job
+    jobs_ahead = []
+
+    def record_jobs_ahead(job, *args, **kwargs):
+        jobs_ahead.append(len(pulled_jobs) - int(job['output_dag_file_name'][len("dag_"):-len(".py")]))
+        return run_job(job, *args, **kwargs)
+
+    # Threads stand for the worker processes, so that the jobs pulled can be counted while each job runs
+    with patch.object(airflowdaggenerator, "ProcessPoolExecutor", ThreadPoolExecutor), \
+            patch.object(airflowdaggenerator, "_run_job", record_jobs_ahead), \
+            patch.object(airflowdaggenerator, "JOBS_PER_CHUNK", 4):
+        results = airflowdaggenerator.generate_dags(iter_jobs(), validate=False, workers=2)
+
+    assert [result.output_dag_file for result in results] == [
+        output_dag_path + os.path.sep + "dag_{}.py".format(index) for index in range(300)]
+    # At most 2 workers * 4 chunks of 4 jobs are queued, along with the chunk pulled while waiting for the oldest one
+    assert max(jobs_ahead) <= 2 * 4 * 4 + 4
+
+
+def test_generate_dags_throws_exception_when_workers_is_less_than_one():
+    with pytest.raises(ValueError):
+        airflowdaggenerator.generate_dags([], workers=0)
+
+
+def test_validate_dag_ignores_invalid_dags_outside_of_the_given_files(input_config_yaml_path,
+                                                                      input_config_yaml_file_name,
+                                                                      input_template_path, input_template_file_name,
+                                                                      input_template_having_invalid_task_file_name,
+                                                                      output_dag_path):
+    airflowdaggenerator.generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                                     input_template_file_name, output_dag_path, "valid_dag.py")
+    airflowdaggenerator.generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                                     input_template_having_invalid_task_file_name, output_dag_path, "invalid_dag.py")
+
+    airflowdaggenerator.validate_dag([output_dag_path + os.path.sep + "valid_dag.py"])
+
+
+def test_get_import_errors_reports_the_file_each_error_came_from(input_config_yaml_path, input_config_yaml_file_name,
+                                                                 input_template_path, input_template_file_name,
+                                                                 input_template_having_invalid_task_file_name,
+                                                                 output_dag_path):
+    valid_dag_file = output_dag_path + os.path.sep + "valid_dag.py"
+    invalid_dag_file = output_dag_path + os.path.sep + "invalid_dag.py"
+    airflowdaggenerator.generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                                     input_template_file_name, output_dag_path, "valid_dag.py")
+    airflowdaggenerator.generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                                     input_template_having_invalid_task_file_name, output_dag_path, "invalid_dag.py")
+
+    import_errors = airflowdaggenerator.get_import_errors([valid_dag_file, invalid_dag_file])
+
+    assert list(import_errors) == [invalid_dag_file]
+    assert "name 'echo_task' is not defined" in import_errors[invalid_dag_file]
+
+
+def test_generate_dag_does_not_import_airflow(input_config_yaml_path, input_config_yaml_file_name,
+                                              input_template_path, input_template_file_name, output_dag_path,
+                                              output_dag_file_name):
+    script = ("import sys\n"
+              "from airflowdaggenerator import airflowdaggenerator\n"
+              "airflowdaggenerator.generate_dag({!r}, {!r}, {!r}, {!r}, {!r}, {!r})\n"
+              "assert 'airflow' not in sys.modules\n").format(input_config_yaml_path, input_config_yaml_file_name,
+                                                              input_template_path, input_template_file_name,
+                                                              output_dag_path, output_dag_file_name)
+
+    subprocess.check_call([sys.executable, "-c", script])
+
+
+def test_main_with_no_validate_generates_output_dag_file_without_validating_it(input_config_yaml_path,
+                                                                               input_config_yaml_file_name,
+                                                                               input_template_path,
+                                                                               input_template_file_name,
+                                                                               output_dag_path,
+                                                                               output_dag_file_name):
+    with patch.object(sys, 'argv', ["prog",
+                                    "-config_yml_path", input_config_yaml_path,
+                                    "-config_yml_file_name", input_config_yaml_file_name,
+                                    "-template_path", input_template_path,
+                                    "-template_file_name", input_template_file_name,
+                                    "-dag_path", output_dag_path, "-dag_file_name", output_dag_file_name,
+                                    "--no-validate"]):
+        with patch.object(airflowdaggenerator, 'validate_dag') as validate_dag:
+            airflowdaggenerator.main()
+
+    assert os.path.isfile(output_dag_path + os.path.sep + output_dag_file_name)
+    validate_dag.assert_not_called()
+
+
+def test_main_with_dry_run_prints_the_diff_without_writing_nor_validating(input_config_yaml_path,
+                                                                          input_config_yaml_file_name,
+                                                                          input_template_path,
+                                                                          input_template_file_name,
+                                                                          output_dag_path,
+                                                                          output_dag_file_name, capsys):
+    output_dag_file = output_dag_path + os.path.sep + output_dag_file_name
+    with open(output_dag_file, "w") as existing_dag_file:
+        existing_dag_file.write("# stale\n")
+    with patch.object(sys, 'argv', ["prog",
+                                    "-config_yml_path", input_config_yaml_path,
+                                    "-config_yml_file_name", input_config_yaml_file_name,
+                                    "-template_path", input_template_path,
+                                    "-template_file_name", input_template_file_name,
+                                    "-dag_path", output_dag_path, "-dag_file_name", output_dag_file_name,
+                                    "--dry-run"]):
+        with patch.object(airflowdaggenerator, 'validate_dag') as validate_dag:
+            with pytest.raises(SystemExit) as exception_info:
+                airflowdaggenerator.main()
+
+    assert exception_info.value.code != 0
+    assert capsys.readouterr().out.startswith("--- {0}\n+++ {0}\n@@ -1 +1,".format(output_dag_file))
+    with open(output_dag_file) as existing_dag_file:
+        assert existing_dag_file.read() == "# stale\n"
+    validate_dag.assert_not_called()
+
+
+def test_main_batch_with_dry_run_succeeds_when_no_dag_would_change(input_config_yaml_path, input_template_path,
+                                                                   input_template_file_name, output_dag_path, capsys):
+    batch_args = ["prog", "batch", "-config_yml_dir", input_config_yaml_path, "-template_path", input_template_path,
+                  "-template_file_name", input_template_file_name, "-dag_path", output_dag_path, "--no-validate"]
+    with patch.object(sys, 'argv', batch_args):
+        airflowdaggenerator.main()
+    capsys.readouterr()
+
+    with patch.object(sys, 'argv', batch_args + ["--diff"]):
+        airflowdaggenerator.main()
+
+    assert capsys.readouterr().out == ""
+
+
+def test_main_with_validate_only_validates_without_generating(output_dag_path, output_dag_file_name):
+    with patch.object(sys, 'argv', ["prog", "-dag_path", output_dag_path, "-dag_file_name", output_dag_file_name,
+                                    "--validate-only"]):
+        with patch.object(airflowdaggenerator, 'generate_dag') as generate_dag, \
+                patch.object(airflowdaggenerator, 'validate_dag') as validate_dag:
+            airflowdaggenerator.main()
+
+    generate_dag.assert_not_called()
+    validate_dag.assert_called_once_with(output_dag_path + os.path.sep + output_dag_file_name, None)
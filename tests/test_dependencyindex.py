@@ -0,0 +1,97 @@
+import os
+import sys
+
+from mock import patch
+
+from airflowdaggenerator import airflowdaggenerator, dependencyindex
+
+from .conftest import write_file
+
+
+def _write_templates(output_dag_path):
+    template_dir = output_dag_path + os.path.sep + "templates"
+    os.mkdir(template_dir)
+    write_file(template_dir + os.path.sep + "first.py.j2", "{% extends 'base.j2' %}")
+    write_file(template_dir + os.path.sep + "second.py.j2", "dag_id = '{{ dag_id }}'\n")
+    write_file(template_dir + os.path.sep + "base.j2", "{% include 'common.j2' %}")
+    write_file(template_dir + os.path.sep + "common.j2", "dag_id = '{{ dag_id }}'\n")
+    return template_dir
+
+
+def _get_jobs(template_dir, output_dag_path):
+    return [dict(config={"dag_id": name}, config_source="configs.yml#{}".format(index),
+                 input_template_path=template_dir, input_template_file_name="{}.py.j2".format(name),
+                 output_dag_path=output_dag_path, output_dag_file_name="{}.py".format(name))
+            for index, name in enumerate(["first", "second"])]
+
+
+def test_generate_dags_records_the_transitive_template_dependencies(output_dag_path):
+    template_dir = _write_templates(output_dag_path)
+    index_file = output_dag_path + os.path.sep + "index.json"
+
+    airflowdaggenerator.generate_dags(_get_jobs(template_dir, output_dag_path), validate=False,
+                                      dependency_index_file=index_file)
+
+    dependency_index = dependencyindex.load_dependency_index(index_file)
+    assert dependency_index[os.path.abspath(output_dag_path + os.path.sep + "first.py")] == sorted(
+        os.path.abspath(path) for path in ["configs.yml"] + [template_dir + os.path.sep + name for name in
+                                                             ("first.py.j2", "base.j2", "common.j2")])
+    assert dependencyindex.get_affected_dag_files(dependency_index, [template_dir + os.path.sep + "common.j2"]) == [
+        os.path.abspath(output_dag_path + os.path.sep + "first.py")]
+    assert len(dependencyindex.get_affected_dag_files(dependency_index, ["configs.yml"])) == 2
+
+
+def test_generate_dags_records_the_dependencies_without_holding_the_jobs(output_dag_path):
+    template_dir = _write_templates(output_dag_path)
+    index_file = output_dag_path + os.path.sep + "index.json"
+    jobs = iter(_get_jobs(template_dir, output_dag_path))
+
+    results = airflowdaggenerator.generate_dags(jobs, validate=False, workers=2, dependency_index_file=index_file,
+                                                build_cache_file=output_dag_path + os.path.sep + "cache.json")
+    os.remove(index_file)
+    skipped_results = airflowdaggenerator.generate_dags(_get_jobs(template_dir, output_dag_path), validate=False,
+                                                        dependency_index_file=index_file,
+                                                        build_cache_file=output_dag_path + os.path.sep + "cache.json")
+
+    assert [result.error for result in results] == [None, None]
+    assert all(result.skipped for result in skipped_results)
+    # The dependencies of the skipped DAGs missing from the index are recorded too
+    assert sorted(dependencyindex.load_dependency_index(index_file)) == [
+        os.path.abspath(output_dag_path + os.path.sep + name) for name in ("first.py", "second.py")]
+
+
+def test_get_affected_jobs_keeps_the_jobs_missing_from_the_index(output_dag_path):
+    template_dir = _write_templates(output_dag_path)
+    jobs = _get_jobs(template_dir, output_dag_path)
+    dependency_index = {}
+    dependencyindex.update_dependency_index(dependency_index, jobs[:1])
+
+    assert list(dependencyindex.get_affected_jobs(jobs, dependency_index,
+                                                  [template_dir + os.path.sep + "base.j2"])) == jobs
+    assert list(dependencyindex.get_affected_jobs(jobs, dependency_index, ["unrelated.j2"])) == jobs[1:]
+
+
+def test_update_dependency_index_removes_the_dags_whose_templates_are_invalid(output_dag_path):
+    template_dir = _write_templates(output_dag_path)
+    jobs = _get_jobs(template_dir, output_dag_path)
+    dependency_index = {}
+    dependencyindex.update_dependency_index(dependency_index, jobs)
+    write_file(template_dir + os.path.sep + "second.py.j2", "{% include %}")
+
+    dependencyindex.update_dependency_index(dependency_index, jobs[1:])
+
+    assert list(dependency_index) == [os.path.abspath(output_dag_path + os.path.sep + "first.py")]
+
+
+def test_main_affected_prints_the_dag_files_depending_on_the_changed_files(output_dag_path, capsys):
+    template_dir = _write_templates(output_dag_path)
+    index_file = output_dag_path + os.path.sep + "index.json"
+    dependency_index = {}
+    dependencyindex.update_dependency_index(dependency_index, _get_jobs(template_dir, output_dag_path))
+    dependencyindex.save_dependency_index(index_file, dependency_index)
+
+    with patch.object(sys, 'argv', ["prog", "affected", "-dependency_index", index_file,
+                                    template_dir + os.path.sep + "second.py.j2"]):
+        airflowdaggenerator.main()
+
+    assert capsys.readouterr().out == os.path.abspath(output_dag_path + os.path.sep + "second.py") + "\n"
@@ -0,0 +1,122 @@
+import io
+import json
+import multiprocessing
+import os
+import pstats
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from mock import patch
+
+from airflowdaggenerator import airflowdaggenerator, instrumentation
+
+
+def test_generate_dag_emits_an_event_for_each_stage(input_config_yaml_path, input_config_yaml_file_name,
+                                                    input_template_path, input_template_file_name, output_dag_path,
+                                                    output_dag_file_name):
+    events = []
+    instrumentation.add_hook(events.append)
+    try:
+        airflowdaggenerator.generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                                         input_template_file_name, output_dag_path, output_dag_file_name)
+    finally:
+        instrumentation.remove_hook(events.append)
+
+    assert [event['stage'] for event in events] == ['config_load', 'schema_validate', 'template_compile', 'render',
+                                                    'write']
+    assert {event['dag'] for event in events} == {output_dag_file_name}
+    assert all(event['seconds'] >= 0 for event in events)
+    assert events[4]['changed']
+    assert events[4]['bytes'] == os.path.getsize(output_dag_path + os.path.sep + output_dag_file_name)
+
+
+def test_measure_does_nothing_without_hooks():
+    with instrumentation.measure('render', 'dag.py') as event:
+        pass
+
+    assert event == {}
+
+
+def test_generate_dags_with_workers_emits_the_events_of_the_workers(input_config_yaml_path,
+                                                                    input_config_yaml_file_name, input_template_path,
+                                                                    input_template_file_name, output_dag_path):
+    jobs = [{'input_config_yaml_path': input_config_yaml_path,
+             'input_config_yaml_file_name': input_config_yaml_file_name,
+             'input_template_path': input_template_path,
+             'input_template_file_name': input_template_file_name,
+             'output_dag_path': output_dag_path,
+             'output_dag_file_name': 'dag_{}.py'.format(index)} for index in range(2)]
+    events = []
+    instrumentation.add_hook(events.append)
+    try:
+        airflowdaggenerator.generate_dags(jobs, validate=False, workers=2)
+    finally:
+        instrumentation.remove_hook(events.append)
+
+    assert sorted((event['dag'], event['stage']) for event in events if event['stage'] == 'render') == [
+        ('dag_0.py', 'render'), ('dag_1.py', 'render')]
+
+
+def test_generate_dags_with_spawned_workers_emits_the_events_of_the_workers(input_config_yaml_path,
+                                                                            input_config_yaml_file_name,
+                                                                            input_template_path,
+                                                                            input_template_file_name,
+                                                                            output_dag_path):
+    jobs = [{'input_config_yaml_path': input_config_yaml_path,
+             'input_config_yaml_file_name': input_config_yaml_file_name,
+             'input_template_path': input_template_path,
+             'input_template_file_name': input_template_file_name,
+             'output_dag_path': output_dag_path,
+             'output_dag_file_name': 'dag_{}.py'.format(index)} for index in range(2)]
+    events = []
+    # Spawned workers don't inherit the hooks registered in this process
+    spawning_executor = partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+    instrumentation.add_hook(events.append)
+    try:
+        with patch.object(airflowdaggenerator, 'ProcessPoolExecutor', spawning_executor):
+            airflowdaggenerator.generate_dags(jobs, validate=False, workers=2)
+    finally:
+        instrumentation.remove_hook(events.append)
+
+    assert sorted(event['dag'] for event in events if event['stage'] == 'render') == ['dag_0.py', 'dag_1.py']
+
+
+def test_json_lines_exporter_writes_one_event_per_line():
+    stream = io.StringIO()
+    exporter = instrumentation.JsonLinesExporter(stream)
+
+    exporter({'stage': 'render', 'dag': 'dag.py', 'seconds': 0.5})
+    exporter({'stage': 'write', 'dag': 'dag.py', 'seconds': 0.1, 'bytes': 10})
+
+    assert [json.loads(line)['stage'] for line in stream.getvalue().splitlines()] == ['render', 'write']
+
+
+def test_statsd_exporter_sends_duration_and_bytes_metrics():
+    exporter = instrumentation.StatsdExporter('localhost', 8125, prefix='dags')
+    with patch.object(exporter, 'socket') as statsd_socket:
+        exporter({'stage': 'write', 'dag': 'dag.py', 'seconds': 0.25, 'bytes': 10})
+
+    statsd_socket.sendto.assert_called_once_with(b'dags.write.duration:250.000|ms\ndags.write.bytes:10|c',
+                                                 ('localhost', 8125))
+
+
+def test_main_with_metrics_file_and_profile_writes_the_reports(input_config_yaml_path, input_config_yaml_file_name,
+                                                               input_template_path, input_template_file_name,
+                                                               output_dag_path, output_dag_file_name):
+    metrics_file = output_dag_path + os.path.sep + "metrics.jsonl"
+    profile_file = output_dag_path + os.path.sep + "run.prof"
+    with patch.object(sys, 'argv', ["prog",
+                                    "-config_yml_path", input_config_yaml_path,
+                                    "-config_yml_file_name", input_config_yaml_file_name,
+                                    "-template_path", input_template_path,
+                                    "-template_file_name", input_template_file_name,
+                                    "-dag_path", output_dag_path, "-dag_file_name", output_dag_file_name,
+                                    "--no-validate", "-metrics_file", metrics_file, "--profile", profile_file]):
+        airflowdaggenerator.main()
+
+    with open(metrics_file) as metrics:
+        assert [json.loads(line)['stage'] for line in metrics] == ['config_load', 'schema_validate',
+                                                                   'template_compile', 'render', 'write']
+    assert pstats.Stats(profile_file).total_calls > 0
+    assert not instrumentation._hooks
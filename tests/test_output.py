@@ -0,0 +1,107 @@
+import io
+import os
+import stat
+
+from mock import patch
+
+from airflowdaggenerator import airflowdaggenerator, output
+
+
+def test_write_if_changed_leaves_file_with_same_content_untouched(output_dag_path):
+    output_file = output_dag_path + os.path.sep + "dag.py"
+
+    assert output.write_if_changed(output_file, "dag = 1\n")
+    os.utime(output_file, (0, 0))
+
+    assert not output.write_if_changed(output_file, "dag = 1\n")
+    assert os.path.getmtime(output_file) == 0
+
+
+def test_write_if_changed_replaces_file_without_leaving_temporary_files(output_dag_path):
+    output_file = output_dag_path + os.path.sep + "dag.py"
+    output.write_if_changed(output_file, "dag = 1\n")
+    os.chmod(output_file, 0o640)
+
+    assert output.write_if_changed(output_file, "dag = 2\n")
+
+    with open(output_file) as written_file:
+        assert written_file.read() == "dag = 2\n"
+    assert stat.S_IMODE(os.stat(output_file).st_mode) == 0o640
+    assert os.listdir(output_dag_path) == ["dag.py"]
+
+
+def test_write_if_changed_creates_files_with_the_permissions_of_the_umask(output_dag_path):
+    output_file = output_dag_path + os.path.sep + "dag.py"
+    umask = os.umask(0o027)
+    try:
+        # The umask is process wide, changing it (even briefly) could affect the files of the other threads
+        with patch.object(os, "umask", side_effect=AssertionError("The umask must not be changed")):
+            output.write_if_changed(output_file, "dag = 1\n")
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(os.stat(output_file).st_mode) == 0o640
+
+
+def test_write_diff_writes_unified_diff_without_writing_the_file(output_dag_path):
+    output_file = output_dag_path + os.path.sep + "dag.py"
+    stream = io.StringIO()
+
+    assert output.write_diff(output_file, "dag = 1\n", stream)
+    assert stream.getvalue() == "--- /dev/null\n+++ {0}\n@@ -0,0 +1 @@\n+dag = 1\n".format(output_file)
+    assert not os.path.exists(output_file)
+
+    output.write_if_changed(output_file, "dag = 1\n")
+    stream = io.StringIO()
+    assert not output.write_diff(output_file, "dag = 1\n", stream)
+    assert output.write_diff(output_file, "dag = 2", stream)
+    assert stream.getvalue() == "--- {0}\n+++ {0}\n@@ -1 +1 @@\n-dag = 1\n+dag = 2\n\\ No newline at end of file\n" \
+        .format(output_file)
+
+
+def test_update_output_manifest_records_hashes_relative_to_the_manifest(output_dag_path):
+    manifest_file = output_dag_path + os.path.sep + "manifest.json"
+
+    output.update_output_manifest(manifest_file, {output_dag_path + os.path.sep + "first.py": "1",
+                                                  output_dag_path + os.path.sep + "second.py": "2"})
+    output.update_output_manifest(manifest_file, {output_dag_path + os.path.sep + "first.py": None,
+                                                  output_dag_path + os.path.sep + "second.py": "3"})
+
+    assert output.load_output_manifest(manifest_file) == {"second.py": "3"}
+
+
+def test_generate_dags_reports_unchanged_dags_and_records_output_manifest(input_config_yaml_path,
+                                                                          input_config_yaml_file_name,
+                                                                          input_template_path,
+                                                                          input_template_file_name, output_dag_path,
+                                                                          output_dag_file_name):
+    job = dict(input_config_yaml_path=input_config_yaml_path, input_config_yaml_file_name=input_config_yaml_file_name,
+               input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+               output_dag_path=output_dag_path, output_dag_file_name=output_dag_file_name)
+    manifest_file = output_dag_path + os.path.sep + "manifest.json"
+
+    first_run, = airflowdaggenerator.generate_dags([job], validate=False, output_manifest_file=manifest_file)
+    second_run, = airflowdaggenerator.generate_dags([job], validate=False, output_manifest_file=manifest_file)
+
+    assert first_run.changed and not second_run.changed
+    with open(output_dag_path + os.path.sep + output_dag_file_name, "rb") as dag_file:
+        dag_file_hash = output.compute_hash(dag_file.read())
+    assert output.load_output_manifest(manifest_file) == {output_dag_file_name: dag_file_hash}
+
+
+def test_generate_dags_keeps_the_manifest_entries_of_the_failed_dags(input_config_yaml_path,
+                                                                     input_config_yaml_file_name, input_template_path,
+                                                                     input_template_file_name, output_dag_path,
+                                                                     output_dag_file_name):
+    job = dict(input_config_yaml_path=input_config_yaml_path, input_config_yaml_file_name=input_config_yaml_file_name,
+               input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+               output_dag_path=output_dag_path, output_dag_file_name=output_dag_file_name)
+    manifest_file = output_dag_path + os.path.sep + "manifest.json"
+    airflowdaggenerator.generate_dags([job], validate=False, output_manifest_file=manifest_file)
+    output_manifest = output.load_output_manifest(manifest_file)
+
+    failed_run, = airflowdaggenerator.generate_dags([dict(job, input_config_yaml_file_name="missing.yml")],
+                                                    validate=False, output_manifest_file=manifest_file)
+
+    assert failed_run.error
+    assert output.load_output_manifest(manifest_file) == output_manifest
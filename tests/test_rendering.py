@@ -0,0 +1,48 @@
+import io
+import os
+
+import pytest
+
+from airflowdaggenerator import rendering
+from airflowdaggenerator.output import compute_hash
+from airflowdaggenerator.templates import get_template_environment
+
+
+def test_render_dag_renders_a_config_stream_in_memory(input_config_yaml_path, input_config_yaml_file_name,
+                                                      input_template_path, input_template_file_name):
+    template = get_template_environment(input_template_path).get_template(input_template_file_name)
+    with open(input_config_yaml_path + os.path.sep + input_config_yaml_file_name) as config_stream:
+        rendered_dag = rendering.render_dag(config_stream, template)
+
+    assert rendered_dag.dag_id == "calculation_ingestion_job"
+    assert rendered_dag.file_name == "calculation_ingestion_job.py"
+    assert "calculation_ingestion_job" in rendered_dag.source
+    assert rendered_dag.hash == compute_hash(rendered_dag.source)
+    assert sorted(rendered_dag.timings) == ["config_load", "render", "schema_validate"]
+
+
+def test_render_dags_renders_every_config_with_the_template_source():
+    rendered_dags = rendering.render_dags(io.StringIO("dag_id: first\n---\ndag_id: second\n"),
+                                          "dag_id = '{{ dag_id }}'\n")
+
+    assert [(rendered_dag.file_name, rendered_dag.source) for rendered_dag in rendered_dags] == [
+        ("first.py", "dag_id = 'first'"), ("second.py", "dag_id = 'second'")]
+    assert rendering.compile_template("dag_id = '{{ dag_id }}'\n") is rendering.compile_template(
+        "dag_id = '{{ dag_id }}'\n")
+
+
+def test_render_dags_throws_exception_when_dag_ids_are_duplicated():
+    with pytest.raises(ValueError):
+        rendering.render_dags([{"dag_id": "job"}, {"dag_id": "job"}], "dag_id = '{{ dag_id }}'\n")
+
+
+def test_render_dag_throws_exception_when_no_dag_file_name_can_be_derived():
+    with pytest.raises(ValueError):
+        rendering.render_dag({"message": "Hello World"}, "dag_id = '{{ dag_id }}'\n")
+
+
+@pytest.mark.parametrize("config,file_name", [({"dag_id": "../escaped"}, None), ({"dag_id": "job"}, "../escaped.py"),
+                                              ({"dag_id": "job"}, "nested/job.py")])
+def test_render_dag_throws_exception_when_dag_file_name_would_escape_the_output(config, file_name):
+    with pytest.raises(ValueError):
+        rendering.render_dag(config, "dag_id = '{{ dag_id }}'\n", file_name)
@@ -0,0 +1,109 @@
+import os
+import shutil
+
+import pytest
+from mock import patch
+
+from airflowdaggenerator import airflowdaggenerator, schemas
+from airflowdaggenerator.templates import get_template_environment
+
+from .conftest import write_file
+
+EMAIL_LIST_SCHEMA = ("type: object\n"
+                     "required: [dag_id, email_list]\n"
+                     "properties:\n"
+                     "  dag_id: {type: string, pattern: '^[\\w.-]+$'}\n"
+                     "  email_list: {type: array, minItems: 1, items: {type: string, minLength: 1}}\n")
+
+
+def _copy_template_with_schema(input_template_path, input_template_file_name, template_dir):
+    os.mkdir(template_dir)
+    shutil.copy(input_template_path + os.path.sep + input_template_file_name, template_dir)
+    write_file(template_dir + os.path.sep + input_template_file_name + schemas.SCHEMA_FILE_SUFFIX, EMAIL_LIST_SCHEMA)
+
+
+def test_compile_schema_returns_path_qualified_errors():
+    validate = schemas.compile_schema({"type": "object", "required": ["schedule_interval"], "properties": {
+        "default_args": {"type": "object", "additionalProperties": False,
+                         "properties": {"retries": {"type": "integer", "minimum": 0}}},
+        "email_list": {"type": "array", "items": {"type": "string"}}}})
+
+    assert validate({"default_args": {"retries": -1, "owner": "data"}, "email_list": ["a@b.com", None]}) == [
+        "(root): missing required property 'schedule_interval'",
+        "default_args.retries: -1 is less than 0",
+        "default_args.owner: unexpected property",
+        "email_list[1]: None is not of type 'string'"]
+    assert validate({"schedule_interval": "@daily"}) == []
+
+
+def test_compile_schema_throws_exception_when_schema_is_invalid():
+    with pytest.raises(ValueError):
+        schemas.compile_schema({"properties": {"dag_id": {"type": "text"}}})
+
+
+def test_get_template_schema_compiles_the_schema_alongside_the_template_once(input_template_path,
+                                                                             input_template_file_name,
+                                                                             output_dag_path):
+    template_dir = output_dag_path + os.path.sep + "templates"
+    _copy_template_with_schema(input_template_path, input_template_file_name, template_dir)
+    env = get_template_environment(template_dir)
+
+    validate = schemas.get_template_schema(env, input_template_file_name)
+
+    assert schemas.get_template_schema(env, input_template_file_name) is validate
+    assert validate({"dag_id": "job", "email_list": []}) == ["email_list: [] has fewer than 1 items"]
+    assert schemas.get_template_schema(env, "missing.py.j2") is None
+
+
+def test_get_template_schema_memoizes_a_missing_schema_until_it_is_added(input_template_path,
+                                                                          input_template_file_name, output_dag_path):
+    template_dir = output_dag_path + os.path.sep + "templates"
+    os.mkdir(template_dir)
+    shutil.copy(input_template_path + os.path.sep + input_template_file_name, template_dir)
+    env = get_template_environment(template_dir)
+    assert schemas.get_template_schema(env, input_template_file_name) is None
+
+    with patch.object(env.loader, 'get_source', side_effect=env.loader.get_source) as get_source:
+        assert schemas.get_template_schema(env, input_template_file_name) is None
+    write_file(template_dir + os.path.sep + input_template_file_name + schemas.SCHEMA_FILE_SUFFIX, EMAIL_LIST_SCHEMA)
+    os.utime(template_dir, ns=(0, 0))
+
+    assert get_source.call_count == 0
+    assert schemas.get_template_schema(env, input_template_file_name) is not None
+
+
+def test_check_configs_reports_the_errors_of_all_the_configs(input_config_yaml_path, input_config_yaml_file_name,
+                                                             input_template_path, input_template_file_name,
+                                                             output_dag_path):
+    template_dir = output_dag_path + os.path.sep + "templates"
+    _copy_template_with_schema(input_template_path, input_template_file_name, template_dir)
+    jobs = [dict(config=config, config_source=str(index), input_template_path=template_dir,
+                 input_template_file_name=input_template_file_name, output_dag_path=output_dag_path,
+                 output_dag_file_name="dag_{}.py".format(index))
+            for index, config in enumerate([{"dag_id": "first", "email_list": ["a@b.com"]},
+                                            {"dag_id": "second job", "email_list": ["a@b.com"]},
+                                            {"email_list": ["a@b.com", None]}])]
+
+    config_errors = airflowdaggenerator.check_configs(jobs)
+
+    assert sorted(config_errors) == ["1", "2"]
+    assert "dag_id: 'second job' does not match" in config_errors["1"]
+    assert "(root): missing required property 'dag_id'; email_list[1]: None is not of type 'string'" in \
+        config_errors["2"]
+    assert os.listdir(output_dag_path) == ["templates"]
+
+
+def test_generate_dag_throws_exception_before_rendering_an_invalid_config(input_config_yaml_path,
+                                                                          input_config_yaml_file_name,
+                                                                          input_template_path,
+                                                                          input_template_file_name,
+                                                                          output_dag_path, output_dag_file_name):
+    template_dir = output_dag_path + os.path.sep + "templates"
+    _copy_template_with_schema(input_template_path, input_template_file_name, template_dir)
+
+    with pytest.raises(ValueError) as exception_info:
+        airflowdaggenerator.generate_dag(input_config_yaml_path, input_config_yaml_file_name, template_dir,
+                                         input_template_file_name, output_dag_path, output_dag_file_name)
+
+    assert "email_list[2]: None is not of type 'string'" in str(exception_info.value)
+    assert not os.path.exists(output_dag_path + os.path.sep + output_dag_file_name)
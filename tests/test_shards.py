@@ -0,0 +1,139 @@
+import os
+import sys
+import types
+
+import pytest
+from mock import patch
+
+from airflowdaggenerator import airflowdaggenerator, shards
+
+
+def _write_configs(input_config_yaml_path, input_config_yaml_file_name, config_dir, count):
+    with open(input_config_yaml_path + os.path.sep + input_config_yaml_file_name) as config:
+        source = config.read()
+    for index in range(count):
+        with open(config_dir + os.path.sep + "dag_{}.yml".format(index), "w") as config:
+            config.write(source.replace("calculation_ingestion_job", "job_{}".format(index)))
+
+
+def test_get_shard_index_is_stable_and_within_the_shards():
+    assert shards.get_shard_index("first_job.py", 8) == shards.get_shard_index("first_job.py", 8)
+    assert {shards.get_shard_index("job_{}.py".format(index), 8) for index in range(100)} == set(range(8))
+
+
+def test_generate_dag_shards_renders_every_dag_into_its_shard(input_config_yaml_path, input_config_yaml_file_name,
+                                                              input_template_path, input_template_file_name,
+                                                              output_dag_path):
+    config_dir = output_dag_path + os.path.sep + "configs"
+    os.mkdir(config_dir)
+    _write_configs(input_config_yaml_path, input_config_yaml_file_name, config_dir, 10)
+    jobs = airflowdaggenerator.jobs_from_config_directory(config_dir, input_template_path, input_template_file_name,
+                                                          output_dag_path)
+
+    results = shards.generate_dag_shards(jobs, 3, validate=False)
+
+    assert sorted(name for name in os.listdir(output_dag_path) if name.endswith(".py")) == [
+        "dag_shard_0.py", "dag_shard_1.py", "dag_shard_2.py"]
+    for job, result in zip(jobs, results):
+        assert result.error is None
+        assert os.path.basename(result.output_dag_file) == shards.get_shard_file_name(
+            "dag_shard", shards.get_shard_index(job["output_dag_file_name"], 3), 3)
+        with open(result.output_dag_file) as shard_file:
+            shard_source = shard_file.read()
+        compile(shard_source, result.output_dag_file, "exec")
+        assert "dag_id=\\'{}\\'".format(job["output_dag_file_name"].replace("dag_", "job_")[:-3]) in shard_source
+
+
+def test_generate_dag_shards_only_rewrites_the_shard_of_a_changed_dag(input_config_yaml_path,
+                                                                      input_config_yaml_file_name,
+                                                                      input_template_path, input_template_file_name,
+                                                                      output_dag_path):
+    config_dir = output_dag_path + os.path.sep + "configs"
+    os.mkdir(config_dir)
+    _write_configs(input_config_yaml_path, input_config_yaml_file_name, config_dir, 10)
+    jobs = airflowdaggenerator.jobs_from_config_directory(config_dir, input_template_path, input_template_file_name,
+                                                          output_dag_path)
+    shards.generate_dag_shards(jobs, 3, validate=False)
+    with open(config_dir + os.path.sep + "dag_0.yml", "a") as config:
+        config.write("message: 'Changed'\n")
+
+    results = shards.generate_dag_shards(jobs, 3, validate=False)
+
+    changed_shards = {result.output_dag_file for result in results if result.changed}
+    assert changed_shards == {results[0].output_dag_file}
+
+
+def test_generate_dag_shards_leaves_failing_dags_out_of_their_shard(input_config_yaml_path,
+                                                                    input_config_yaml_file_name, input_template_path,
+                                                                    input_template_file_name, output_dag_path):
+    jobs = [dict(config={"dag_id": "broken"}, config_source="broken", input_template_path=input_template_path,
+                 input_template_file_name="dag_template_having_typos.py.j2", output_dag_path=output_dag_path,
+                 output_dag_file_name="broken.py")]
+
+    results = shards.generate_dag_shards(jobs, 1, validate=False)
+
+    assert results[0].error
+    with open(results[0].output_dag_file) as shard_file:
+        assert "holding 0 DAG(s)" in shard_file.read()
+
+
+def test_shard_module_keeps_the_other_dags_when_one_fails_to_load(output_dag_path):
+    airflow = types.ModuleType("airflow")
+    airflow.DAG = type("DAG", (object,), {})
+    shard_source = shards.render_shard_module([("broken.py", "raise RuntimeError('broken')\n"),
+                                               ("valid.py", "from airflow import DAG\ndag = DAG()\n")], 0, 1)
+
+    with patch.dict(sys.modules, {"airflow": airflow}):
+        namespace = {"__file__": output_dag_path + os.path.sep + "dag_shard_0.py", "__name__": "dag_shard_0"}
+        exec(compile(shard_source, namespace["__file__"], "exec"), namespace)
+
+    assert isinstance(namespace["valid.py:dag"], airflow.DAG)
+
+
+def test_generate_dag_shards_leaves_dags_failing_their_import_out_of_their_shard(input_config_yaml_path,
+                                                                                 input_config_yaml_file_name,
+                                                                                 input_template_path,
+                                                                                 input_template_file_name,
+                                                                                 output_dag_path):
+    config_dir = output_dag_path + os.path.sep + "configs"
+    os.mkdir(config_dir)
+    _write_configs(input_config_yaml_path, input_config_yaml_file_name, config_dir, 2)
+    jobs = list(airflowdaggenerator.jobs_from_config_directory(config_dir, input_template_path,
+                                                               input_template_file_name, output_dag_path))
+
+    def get_import_errors(dag_files, validation_pool):
+        return {dag_file: "Broken" for dag_file in dag_files if dag_file.endswith("dag_0.py")}
+
+    with patch.object(shards, "get_import_errors", get_import_errors):
+        results = shards.generate_dag_shards(jobs, 1)
+
+    assert "dag_0.py': 'Broken'" in results[0].error
+    assert results[1].error is None
+    with open(results[1].output_dag_file) as shard_file:
+        assert "holding 1 DAG(s)" in shard_file.read()
+
+
+def test_generate_dag_shards_removes_the_shards_of_a_former_number_of_shards(input_config_yaml_path,
+                                                                             input_config_yaml_file_name,
+                                                                             input_template_path,
+                                                                             input_template_file_name,
+                                                                             output_dag_path):
+    config_dir = output_dag_path + os.path.sep + "configs"
+    os.mkdir(config_dir)
+    _write_configs(input_config_yaml_path, input_config_yaml_file_name, config_dir, 10)
+    jobs = list(airflowdaggenerator.jobs_from_config_directory(config_dir, input_template_path,
+                                                               input_template_file_name, output_dag_path))
+    manifest_file = output_dag_path + os.path.sep + "manifest.json"
+    shards.generate_dag_shards(jobs, 3, validate=False, output_manifest_file=manifest_file)
+
+    shards.generate_dag_shards(jobs, 2, validate=False, output_manifest_file=manifest_file)
+
+    assert sorted(name for name in os.listdir(output_dag_path) if name.endswith(".py")) == [
+        "dag_shard_0.py", "dag_shard_1.py"]
+    with open(manifest_file) as manifest:
+        assert "dag_shard_2.py" not in manifest.read()
+
+
+def test_generate_dag_shards_throws_exception_when_shards_is_less_than_one():
+    with pytest.raises(ValueError):
+        shards.generate_dag_shards([], 0)
@@ -0,0 +1,38 @@
+import io
+import os
+import tarfile
+import zipfile
+
+from airflowdaggenerator import rendering, sinks
+
+
+def _render_dags():
+    return rendering.render_dags([{"dag_id": "first"}, {"dag_id": "second"}], "dag_id = '{{ dag_id }}'\n")
+
+
+def test_write_to_directory_returns_only_the_written_files(output_dag_path):
+    rendered_dags = _render_dags()
+
+    assert sinks.write_to_directory(rendered_dags, output_dag_path) == [
+        output_dag_path + os.path.sep + "first.py", output_dag_path + os.path.sep + "second.py"]
+    assert sinks.write_to_directory(rendered_dags, output_dag_path) == []
+
+
+def test_write_to_tarball_writes_every_dag_at_the_root(output_dag_path):
+    tarball = output_dag_path + os.path.sep + "dags.tar.gz"
+
+    sinks.write_to_tarball(_render_dags(), tarball)
+
+    with tarfile.open(tarball) as archive:
+        assert archive.getnames() == ["first.py", "second.py"]
+        assert archive.extractfile("second.py").read() == b"dag_id = 'second'"
+
+
+def test_write_to_zip_writes_to_a_stream():
+    stream = io.BytesIO()
+
+    sinks.write_to_zip(_render_dags(), stream)
+
+    with zipfile.ZipFile(io.BytesIO(stream.getvalue())) as archive:
+        assert archive.namelist() == ["first.py", "second.py"]
+        assert archive.read("first.py") == b"dag_id = 'first'"
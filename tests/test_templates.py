@@ -0,0 +1,44 @@
+import os
+
+from airflowdaggenerator import templates
+
+from .conftest import write_file
+
+
+def test_get_template_environment_reuses_environment_per_template_folder(input_template_path):
+    assert templates.get_template_environment(input_template_path) is \
+        templates.get_template_environment(input_template_path)
+
+
+def test_get_template_environment_persists_compiled_templates_in_bytecode_cache(input_template_path,
+                                                                               input_template_file_name,
+                                                                               output_dag_path):
+    bytecode_cache_dir = output_dag_path + os.path.sep + "bytecode_cache"
+
+    templates.get_template_environment(input_template_path, bytecode_cache_dir).get_template(input_template_file_name)
+
+    assert len(os.listdir(bytecode_cache_dir)) == 1
+
+
+def test_get_template_sources_returns_transitively_referenced_templates(output_dag_path):
+    write_file(output_dag_path + os.path.sep + "dag.py.j2", "{% extends 'base.py.j2' %}")
+    write_file(output_dag_path + os.path.sep + "base.py.j2",
+               "{% import 'macros.j2' as macros %}{% include 'base.py.j2' %}")
+    write_file(output_dag_path + os.path.sep + "macros.j2", "{% macro task() %}{% endmacro %}")
+
+    sources = templates.get_template_sources(templates.get_template_environment(output_dag_path), "dag.py.j2")
+
+    assert sorted(sources) == ["base.py.j2", "dag.py.j2", "macros.j2"]
+
+
+def test_get_template_environment_looks_templates_up_in_every_folder_of_the_search_path(output_dag_path):
+    library_path = output_dag_path + os.path.sep + "library"
+    os.mkdir(library_path)
+    write_file(output_dag_path + os.path.sep + "dag.py.j2",
+               "{% extends 'base.py.j2' %}{% block task %}team{% endblock %}")
+    write_file(library_path + os.path.sep + "base.py.j2", "task = '{% block task %}{% endblock %}'")
+
+    env = templates.get_template_environment(output_dag_path + os.pathsep + library_path)
+
+    assert env.get_template("dag.py.j2").render() == "task = 'team'"
+    assert templates.get_template_environment([output_dag_path, library_path]) is env
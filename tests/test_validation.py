@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from airflowdaggenerator import airflowdaggenerator, validation
+
+
+def _generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path, template_file_name,
+                  output_dag_path, output_dag_file_name):
+    airflowdaggenerator.generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                                     template_file_name, output_dag_path, output_dag_file_name)
+    return output_dag_path + os.path.sep + output_dag_file_name
+
+
+def test_check_dag_file_finds_no_error_in_valid_dag(input_config_yaml_path, input_config_yaml_file_name,
+                                                    input_template_path, input_template_file_name, output_dag_path,
+                                                    output_dag_file_name):
+    dag_file = _generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                             input_template_file_name, output_dag_path, output_dag_file_name)
+
+    assert validation.check_dag_file(dag_file) == []
+
+
+def test_check_dag_file_detects_cyclic_task_dependency(input_config_yaml_path, input_config_yaml_file_name,
+                                                       input_template_path,
+                                                       input_template_having_cyclic_task_dependency_file_name,
+                                                       output_dag_path, output_dag_file_name):
+    dag_file = _generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                             input_template_having_cyclic_task_dependency_file_name, output_dag_path,
+                             output_dag_file_name)
+
+    errors = validation.check_dag_file(dag_file)
+
+    assert len(errors) == 1
+    assert 'echo_task >> print_message_task >> echo_task' in errors[0]
+
+
+def test_check_dag_file_detects_invalid_task_id_rendered_from_typo(input_config_yaml_path,
+                                                                   input_config_yaml_file_name, input_template_path,
+                                                                   input_template_having_typos_file_name,
+                                                                   output_dag_path, output_dag_file_name):
+    dag_file = _generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                             input_template_having_typos_file_name, output_dag_path, output_dag_file_name)
+
+    errors = validation.check_dag_file(dag_file)
+
+    assert len(errors) == 1
+    assert 'The key () has to be made of alphanumeric characters, dashes, dots and underscores' in errors[0]
+
+
+@pytest.mark.parametrize("source, expected_error", [
+    pytest.param("dag = DAG(dag_id='test'\n", "SyntaxError", id='syntax_error'),
+    pytest.param("a = Operator(task_id='task', dag=dag)\nb = Operator(task_id='task', dag=dag)\n",
+                 "Duplicate task_id task", id='duplicate_task_id'),
+    pytest.param("a = Operator(task_id='first')\nb = Operator(task_id='second')\n"
+                 "a.set_downstream(b)\nb.set_downstream([a])\n", "first >> second >> first",
+                 id='cycle_through_set_downstream'),
+    pytest.param("a = Operator(task_id='first')\nb = Operator(task_id='second')\nc = Operator(task_id='third')\n"
+                 "a >> [b, c]\na << c\n", "first >> third >> first", id='cycle_through_shift_operators'),
+])
+def test_check_dag_source_detects_errors(source, expected_error):
+    errors = validation.check_dag_source(source)
+
+    assert len(errors) == 1
+    assert expected_error in errors[0]
+
+
+def test_check_dag_source_allows_same_task_id_in_different_dags():
+    source = ("with DAG('first') as first_dag:\n    a = Operator(task_id='task')\n"
+              "with DAG('second') as second_dag:\n    b = Operator(task_id='task')\n")
+
+    assert validation.check_dag_source(source) == []
+
+
+def test_check_dag_source_resolves_task_variables_reused_by_different_dags():
+    source = ("with DAG('first') as first_dag:\n    t1 = Operator(task_id='extract')\n"
+              "    t2 = Operator(task_id='load')\n    t1 >> t2\n"
+              "with DAG('second') as second_dag:\n    t1 = Operator(task_id='extract')\n"
+              "    t2 = Operator(task_id='load')\n    t2 >> t1\n")
+
+    assert validation.check_dag_source(source) == []
+
+
+def test_check_dag_source_resolves_task_variables_to_their_latest_assignment():
+    source = ("a = Operator(task_id='first')\nb = Operator(task_id='second')\na >> b\n"
+              "b = Operator(task_id='third')\nb >> a\na = None\nb >> a\n")
+
+    assert validation.check_dag_source(source) == []
+
+
+def test_validate_dag_rejects_statically_invalid_dag_files(input_config_yaml_path, input_config_yaml_file_name,
+                                                           input_template_path,
+                                                           input_template_having_cyclic_task_dependency_file_name,
+                                                           output_dag_path, output_dag_file_name):
+    dag_file = _generate_dag(input_config_yaml_path, input_config_yaml_file_name, input_template_path,
+                             input_template_having_cyclic_task_dependency_file_name, output_dag_path,
+                             output_dag_file_name)
+
+    with pytest.raises(AssertionError) as exception_info:
+        airflowdaggenerator.validate_dag([dag_file])
+    assert 'Cycle detected in DAG task dependencies' in str(exception_info.value)
@@ -0,0 +1,174 @@
+import os
+import time
+
+import pytest
+from mock import patch
+
+from airflowdaggenerator import airflowdaggenerator, instrumentation, validationpool
+
+
+def _write_dag_files(output_dag_path, count, content="dag = None\n"):
+    dag_files = []
+    for index in range(count):
+        dag_file = output_dag_path + os.path.sep + "dag_{}.py".format(index)
+        with open(dag_file, "w") as output_file:
+            output_file.write(content)
+        dag_files.append(dag_file)
+    return dag_files
+
+
+def _reporting_worker(connection, memory_limit):
+    # Stands for a worker having imported Airflow, reports the process importing every file as its import error
+    connection.send(None)
+    for dag_file in iter(connection.recv, None):
+        connection.send([validationpool.DagImportError(dag_file, "import", str(os.getpid()))])
+
+
+def _hanging_worker(connection, memory_limit):
+    connection.send(None)
+    for dag_file in iter(connection.recv, None):
+        if dag_file.endswith("dag_0.py"):
+            time.sleep(60)
+        connection.send([])
+
+
+def _slowly_starting_worker(connection, memory_limit):
+    # Stands for a worker taking a second to import Airflow
+    time.sleep(1)
+    _reporting_worker(connection, memory_limit)
+
+
+def _hanging_on_start_up_worker(connection, memory_limit):
+    time.sleep(60)
+
+
+def _crashing_worker(connection, memory_limit):
+    connection.send(None)
+    connection.recv()
+    os._exit(3)
+
+
+def test_validate_rejects_statically_invalid_files_without_starting_workers(output_dag_path):
+    dag_files = _write_dag_files(output_dag_path, 1, "def broken(:\n")
+
+    with patch.object(validationpool, "_Worker") as worker:
+        import_errors = validationpool.ValidationPool().validate(dag_files)
+
+    assert import_errors[dag_files[0]].kind == "static"
+    worker.assert_not_called()
+
+
+def test_validate_replaces_workers_after_max_files_per_worker(output_dag_path):
+    dag_files = _write_dag_files(output_dag_path, 4)
+
+    with patch.object(validationpool, "_run_worker", _reporting_worker):
+        with validationpool.ValidationPool(max_files_per_worker=2) as validation_pool:
+            import_errors = validation_pool.validate(dag_files)
+
+    worker_ids = [import_errors[dag_file].message for dag_file in dag_files]
+    assert worker_ids[0] == worker_ids[1] != worker_ids[2] == worker_ids[3]
+
+
+def test_validate_kills_workers_exceeding_the_timeout(output_dag_path):
+    dag_files = _write_dag_files(output_dag_path, 2)
+
+    with patch.object(validationpool, "_run_worker", _hanging_worker):
+        with validationpool.ValidationPool(workers=2, timeout=0.5) as validation_pool:
+            start = time.monotonic()
+            import_errors = validation_pool.validate(dag_files)
+
+    assert time.monotonic() - start < 30
+    assert list(import_errors) == [dag_files[0]]
+    assert import_errors[dag_files[0]].kind == "timeout"
+
+
+def test_validate_starts_the_workers_in_parallel(output_dag_path):
+    dag_files = _write_dag_files(output_dag_path, 4)
+
+    with patch.object(validationpool, "_run_worker", _slowly_starting_worker):
+        with validationpool.ValidationPool(workers=4) as validation_pool:
+            start = time.monotonic()
+            import_errors = validation_pool.validate(dag_files)
+
+    assert time.monotonic() - start < 3
+    assert sorted(import_errors) == dag_files
+
+
+def test_validate_throws_exception_when_a_worker_exceeds_the_startup_timeout(output_dag_path):
+    dag_files = _write_dag_files(output_dag_path, 1)
+
+    with patch.object(validationpool, "_run_worker", _hanging_on_start_up_worker):
+        with validationpool.ValidationPool(startup_timeout=0.5) as validation_pool:
+            start = time.monotonic()
+            with pytest.raises(ImportError):
+                validation_pool.validate(dag_files)
+
+    assert time.monotonic() - start < 30
+
+
+def test_validate_reports_the_file_of_a_crashed_worker(output_dag_path):
+    dag_files = _write_dag_files(output_dag_path, 1)
+
+    with patch.object(validationpool, "_run_worker", _crashing_worker):
+        with validationpool.ValidationPool() as validation_pool:
+            import_errors = validation_pool.validate(dag_files)
+
+    assert import_errors[dag_files[0]].kind == "crash"
+
+
+def test_validate_emits_the_validation_events_of_every_file(output_dag_path):
+    dag_files = _write_dag_files(output_dag_path, 2)
+    events = []
+    instrumentation.add_hook(events.append)
+
+    try:
+        with patch.object(validationpool, "_run_worker", _hanging_worker):
+            with validationpool.ValidationPool(workers=2, timeout=0.5) as validation_pool:
+                validation_pool.validate(dag_files)
+    finally:
+        instrumentation.remove_hook(events.append)
+
+    assert sorted((event["stage"], event["dag"]) for event in events) == [
+        ("dagbag_import", "dag_0.py"), ("dagbag_import", "dag_1.py"),
+        ("static_validate", "dag_0.py"), ("static_validate", "dag_1.py")]
+    # The import of the hanging file is timed until the timeout
+    assert [event["seconds"] >= 0.5 for event in events if event["stage"] == "dagbag_import"] == [False, True]
+
+
+def test_generate_dags_validates_the_generated_files_in_the_validation_pool(input_config_yaml_path,
+                                                                           input_config_yaml_file_name,
+                                                                           input_template_path,
+                                                                           input_template_file_name,
+                                                                           output_dag_path):
+    jobs = [dict(input_config_yaml_path=input_config_yaml_path,
+                 input_config_yaml_file_name=input_config_yaml_file_name,
+                 input_template_path=input_template_path,
+                 input_template_file_name=input_template_file_name,
+                 output_dag_path=output_dag_path,
+                 output_dag_file_name="test_dag.py")]
+
+    with patch.object(validationpool, "_run_worker", _reporting_worker):
+        with validationpool.ValidationPool() as validation_pool:
+            results = airflowdaggenerator.generate_dags(jobs, validation_pool=validation_pool)
+
+    assert results[0].error.startswith("DAG import failures. Errors: {'" + results[0].output_dag_file)
+    # Imported by a worker process, not by this one
+    assert "import: {}".format(os.getpid()) not in results[0].error
+
+
+def test_validate_throws_exception_when_workers_can_not_import_airflow(output_dag_path):
+    try:
+        import airflow  # noqa: F401
+        pytest.skip("Airflow is installed")
+    except ImportError:
+        pass
+    dag_files = _write_dag_files(output_dag_path, 1)
+
+    with validationpool.ValidationPool() as validation_pool:
+        with pytest.raises(ImportError):
+            validation_pool.validate(dag_files)
+
+
+def test_validation_pool_throws_exception_when_workers_is_less_than_one():
+    with pytest.raises(ValueError):
+        validationpool.ValidationPool(workers=0)
@@ -0,0 +1,135 @@
+import os
+import shutil
+
+from mock import patch
+
+from airflowdaggenerator import airflowdaggenerator, watch
+
+
+def _copy_configs(input_config_yaml_path, input_config_yaml_file_name, output_dag_path):
+    config_dir = output_dag_path + os.path.sep + "configs"
+    os.mkdir(config_dir)
+    for config_file_name in ("first.yml", "second.yml"):
+        shutil.copy(input_config_yaml_path + os.path.sep + input_config_yaml_file_name,
+                    config_dir + os.path.sep + config_file_name)
+    return config_dir
+
+
+def test_get_job_dependencies_returns_config_and_template_files(input_config_yaml_path, input_config_yaml_file_name,
+                                                                input_template_path, input_template_file_name,
+                                                                output_dag_path, output_dag_file_name):
+    job = dict(input_config_yaml_path=input_config_yaml_path, input_config_yaml_file_name=input_config_yaml_file_name,
+               input_template_path=input_template_path, input_template_file_name=input_template_file_name,
+               output_dag_path=output_dag_path, output_dag_file_name=output_dag_file_name)
+
+    assert watch.get_job_dependencies(job) == {
+        os.path.abspath(input_config_yaml_path + os.path.sep + input_config_yaml_file_name),
+        os.path.abspath(input_template_path + os.path.sep + input_template_file_name)}
+
+
+def test_watch_regenerates_only_the_dags_depending_on_changed_files(input_config_yaml_path,
+                                                                    input_config_yaml_file_name,
+                                                                    input_template_path, input_template_file_name,
+                                                                    output_dag_path):
+    config_dir = _copy_configs(input_config_yaml_path, input_config_yaml_file_name, output_dag_path)
+    changed_config_file = os.path.abspath(config_dir + os.path.sep + "second.yml")
+    reports = []
+
+    def load_jobs():
+        return airflowdaggenerator.jobs_from_config_directory(config_dir, input_template_path,
+                                                              input_template_file_name, output_dag_path)
+
+    def change_config_file(get_directories, interval):
+        yield {changed_config_file}
+
+    with patch.object(watch, '_iter_polled_changes', change_config_file):
+        watch.watch(load_jobs, reports.append, validate=False, use_polling=True, max_changes=1)
+
+    assert [[os.path.basename(result.output_dag_file) for result in results] for results in reports] == [
+        ["first.py", "second.py"], ["second.py"]]
+
+
+def test_watch_generates_dags_of_added_config_files(input_config_yaml_path, input_config_yaml_file_name,
+                                                    input_template_path, input_template_file_name, output_dag_path):
+    config_dir = _copy_configs(input_config_yaml_path, input_config_yaml_file_name, output_dag_path)
+    added_config_file = os.path.abspath(config_dir + os.path.sep + "third.yml")
+    reports = []
+
+    def load_jobs():
+        return airflowdaggenerator.jobs_from_config_directory(config_dir, input_template_path,
+                                                              input_template_file_name, output_dag_path)
+
+    def add_config_file(get_directories, interval):
+        assert os.path.abspath(config_dir) in get_directories()
+        shutil.copy(config_dir + os.path.sep + "first.yml", added_config_file)
+        yield {added_config_file}
+
+    with patch.object(watch, '_iter_polled_changes', add_config_file):
+        watch.watch(load_jobs, reports.append, validate=False, use_polling=True, max_changes=1)
+
+    assert [os.path.basename(result.output_dag_file) for result in reports[-1]] == ["third.py"]
+
+
+def test_iter_polled_changes_yields_changed_files(output_dag_path):
+    changed_file = os.path.abspath(output_dag_path + os.path.sep + "dag.yml")
+
+    with patch.object(watch.time, 'sleep', side_effect=lambda interval: open(changed_file, "w").close()):
+        changes = watch._iter_polled_changes(lambda: {os.path.abspath(output_dag_path)}, 0)
+        assert next(changes) == {changed_file}
+
+
+def test_watch_survives_a_half_edited_template_and_regenerates_once_fixed(input_config_yaml_path,
+                                                                          input_config_yaml_file_name,
+                                                                          input_template_path, input_template_file_name,
+                                                                          output_dag_path):
+    template_dir = output_dag_path + os.path.sep + "templates"
+    os.mkdir(template_dir)
+    template_file = os.path.abspath(template_dir + os.path.sep + input_template_file_name)
+    shutil.copy(input_template_path + os.path.sep + input_template_file_name, template_file)
+    config_dir = _copy_configs(input_config_yaml_path, input_config_yaml_file_name, output_dag_path)
+    reports = []
+
+    def load_jobs():
+        return airflowdaggenerator.jobs_from_config_directory(config_dir, template_dir, input_template_file_name,
+                                                              output_dag_path)
+
+    def edit_template(get_directories, interval):
+        with open(template_file, "w") as template:
+            template.write("{% if %}")
+        yield {template_file}
+        shutil.copy(input_template_path + os.path.sep + input_template_file_name, template_file)
+        # Any change retries the DAGs whose dependencies are unknown
+        yield {os.path.abspath(config_dir + os.path.sep + "unrelated.txt")}
+
+    with patch.object(watch, '_iter_polled_changes', edit_template):
+        watch.watch(load_jobs, reports.append, validate=False, use_polling=True, max_changes=2)
+
+    assert [[result.error is None for result in results] for results in reports] == [
+        [True, True], [False, False], [True, True]]
+
+
+def test_watch_keeps_the_previous_jobs_when_they_can_not_be_loaded(input_config_yaml_path,
+                                                                   input_config_yaml_file_name,
+                                                                   input_template_path, input_template_file_name,
+                                                                   output_dag_path):
+    config_dir = _copy_configs(input_config_yaml_path, input_config_yaml_file_name, output_dag_path)
+    changed_config_file = os.path.abspath(config_dir + os.path.sep + "second.yml")
+    jobs = list(airflowdaggenerator.jobs_from_config_directory(config_dir, input_template_path,
+                                                               input_template_file_name, output_dag_path))
+    load_results = [jobs, ValueError("Invalid manifest")]
+    reports = []
+
+    def load_jobs():
+        load_result = load_results.pop(0)
+        if isinstance(load_result, Exception):
+            raise load_result
+        return load_result
+
+    def change_config_file(get_directories, interval):
+        yield {changed_config_file}
+
+    with patch.object(watch, '_iter_polled_changes', change_config_file):
+        watch.watch(load_jobs, reports.append, validate=False, use_polling=True, max_changes=1)
+
+    assert "Invalid manifest" in reports[1][0].error
+    assert [os.path.basename(result.output_dag_file) for result in reports[2]] == ["second.py"]